@@ -5,16 +5,41 @@ Bulk operations blueprint for multi-device actions
 from flask import Blueprint, request, jsonify
 from app.database.models import InventoryModel, PreChecksModel, RepositoryModel
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from app.utils.ssh_client import SSHClient
-from app.utils.job_manager import JobManager
-from app.extensions import db, get_config
+from app.utils.image_meta import extract_version
+from app.utils.ip_locks import device_lock
+from app.utils.precheck_engine import PreCheckEngine
+from app.utils.netconf_client import NetconfClient
+from app.extensions import db, get_config, get_job_manager
 import json
 
 bulk_ops_bp = Blueprint('bulk_ops', __name__)
 
 # Load config
 config = get_config()
-job_manager = JobManager(config['database']['path'], config['logs']['path'])
+job_manager = get_job_manager()
+
+# Serializes sqlite writes across worker threads (sqlite connections are not
+# safe for concurrent writes from multiple threads)
+_db_write_lock = threading.Lock()
+
+# Recent Pass/Warning precheck runs keyed by (ip, target_image,
+# current_version). Operators often re-trigger bulk prechecks back to back;
+# identical re-runs inside the TTL are answered from cache instead of
+# re-probing the device over SSH/NETCONF. Failed runs are never cached.
+_precheck_cache = {}
+_precheck_cache_lock = threading.Lock()
+
+# Shared executor for bulk device fan-out. A single persistent pool bounds
+# total concurrent device sessions across overlapping bulk requests (tunable
+# via bulk.max_concurrency) and avoids re-spawning worker threads per request.
+_bulk_executor = ThreadPoolExecutor(
+    max_workers=config.get('bulk', {}).get('max_concurrency', 32),
+    thread_name_prefix='bulk'
+)
 
 
 @bulk_ops_bp.route('/api/prechecks', methods=['POST'])
@@ -36,149 +61,186 @@ def run_prechecks():
     password = config['credentials']['ssh_password']
     enable_password = config['credentials'].get('enable_password', '')
     netconf_port = config['credentials']['netconf_port']
-    
-    results = []
-    
+
     # 1. Validation Phase
+    # Single bulk SELECT instead of one round-trip per IP
+    devices_by_ip = InventoryModel.get_devices_in(db, ip_list)
     missing_target = []
+    target_images = set()
     for ip in ip_list:
-        device = InventoryModel.get_device(db, ip)
+        device = devices_by_ip.get(ip)
         if not device:
             continue # Should maybe error? But stick to target image focus
         if not device.get('target_image'):
             missing_target.append(ip)
-            
+        else:
+            target_images.add(device['target_image'])
+
     if missing_target:
         return jsonify({
-            'success': False, 
+            'success': False,
             'message': f"Target Image not set for: {', '.join(missing_target)}. Please select a target image before running pre-checks."
         }), 400
 
-    from app.utils.precheck_engine import PreCheckEngine
-    from app.utils.netconf_client import NetconfClient
-    
+    # Devices frequently share the same target image; resolve each image's
+    # size once up front instead of per device.
+    image_size_cache = {}
+    for target_image in target_images:
+        target_image_size_mb = 0
+        image_details = RepositoryModel.get_image_details(db, target_image)
+        if image_details and image_details.get('file_path') and os.path.exists(image_details['file_path']):
+            size_bytes = os.path.getsize(image_details['file_path'])
+            target_image_size_mb = size_bytes / (1024 * 1024)
+        image_size_cache[target_image] = target_image_size_mb
+
     # 2. Execution Phase
-    for ip in ip_list:
-        try:
-            device = InventoryModel.get_device(db, ip)
-            if not device:
-                 results.append({'ip': ip, 'status': 'Fail', 'details': 'Device not found in inventory'})
-                 continue
+    # Serve identical recent runs from the TTL cache; everything else fans
+    # out across the shared bulk pool since each device precheck is
+    # dominated by network I/O (NETCONF + SSH).
+    cache_ttl = config.get('bulk', {}).get('precheck_cache_ttl', 30)
+    now = time.monotonic()
+    results = []
+    to_run = []
+    with _precheck_cache_lock:
+        for ip in ip_list:
+            device = devices_by_ip.get(ip)
+            cached = None
+            if device and cache_ttl > 0:
+                key = (ip, device.get('target_image'), device.get('current_version'))
+                entry = _precheck_cache.get(key)
+                if entry and (now - entry['at']) < cache_ttl:
+                    cached = entry['result']
+            if cached:
+                results.append(cached)
+            else:
+                to_run.append(ip)
 
-            # Target image is guaranteed by validation above
-            target_image = device.get('target_image')
+    futures = [
+        _bulk_executor.submit(_run_precheck_for_ip, ip, devices_by_ip.get(ip),
+                              username, password, enable_password, netconf_port, image_size_cache)
+        for ip in to_run
+    ]
+    results.extend(future.result() for future in as_completed(futures))
 
-            # Run PreCheckEngine
-            PreChecksModel.clear_checks_for_device(db, ip)
-            precheck = PreCheckEngine(ip, username, password, netconf_port, enable_password)
-            
-            # Determine filesystem
-            netconf_client = NetconfClient(ip, netconf_port, username, password)
-            filesystem = netconf_client.get_filesystem_for_role(device['device_role'])
-            
-            # We need a target_version for checking. 
-            # If target_image is set, try to extract it, or use "Unknown" if not.
-            # The PreCheckEngine handles version comparison slightly differently now, 
-            # but usually it needs `target_version` string.
-            # Let's try to extract it from filename or inventory if we stored it?
-            # Storing target_version in inventory would be ideal but currently we only have target_image (filename).
-            # We can try to extract it similar to how the old code did, or just pass the filename as target_version for now?
-            # Actually, PreCheckEngine requires `target_version`.
-            # Let's extract it.
-            # Get target image size from repository
-            target_image_size_mb = 0
-            image_details = RepositoryModel.get_image_details(db, target_image)
-            if image_details and image_details.get('file_path') and os.path.exists(image_details['file_path']):
-                size_bytes = os.path.getsize(image_details['file_path'])
-                target_image_size_mb = size_bytes / (1024 * 1024)
-            
-            # Extract version from filename (handling k9. prefix)
-            import re
-            target_version = "Unknown"
-            # Regex Explanation:
-            # (?:k9\.|universalk9\.)?  -> Optional non-capturing group for 'k9.' or 'universalk9.' prefix
-            # (\d+\.\d+\.\d+[a-z]?)    -> Capture group 1: Version number (digits.digits.digits + optional letter)
-            ver_match = re.search(r'(?:k9\.|universalk9\.)?(\d+\.\d+\.\d+[a-z]?)', target_image)
-            if ver_match:
-                target_version = ver_match.group(1)
-
-            check_results = precheck.run_all_checks(
-                current_version=device['current_version'],
-                target_version=target_version,
-                device_role=device['device_role'],
-                filesystem=filesystem,
-                target_image_filename=target_image,
-                target_image_size_mb=target_image_size_mb
-            )
-            
-            # Auto-update image status if Image Presence passed
-            for res in check_results:
-                if res['check_name'] == 'Image Presence':
-                    if res['result'] == 'PASS':
-                        InventoryModel.set_image_copied(db, ip, 'Yes')
-                    elif res['result'] == 'FAIL':
-                         InventoryModel.set_image_copied(db, ip, 'No')
-                         InventoryModel.set_image_verified(db, ip, 'No')
-
-            # Store results
-            for res in check_results:
-                PreChecksModel.add_check(db, ip, res['check_name'], res['result'], res['message'])
-            
-            # Determine overall status
-            all_passed = precheck.all_checks_passed()
-            has_warnings = any(r['result'] == 'WARN' for r in check_results)
-            
-            status = 'Pass'
-            if not all_passed:
-                status = 'Fail'
-            elif has_warnings:
-                status = 'Warning'
-                
-            # Collect failure/warning details for the summary result
-            details = []
-            for res in check_results:
-                if res['result'] in ['FAIL', 'WARN']:
-                     details.append(f"{res['check_name']}: {res['message']}")
-            
-            details_str = '; '.join(details) if details else None
-            
-            # Update device inventory status
-            # Re-fetch or update existing dict to avoid overwriting changes made above
-            device_data = dict(device)
-            device_data['precheck_status'] = status
-            device_data['precheck_details'] = details_str
-            
-            # Ensure we don't overwrite the image status we just set
-            # Check results again to set local dict values
-            for res in check_results:
-                if res['check_name'] == 'Image Presence':
-                     if res['result'] == 'PASS':
-                         device_data['image_copied'] = 'Yes'
-                     elif res['result'] == 'FAIL':
-                         device_data['image_copied'] = 'No'
-                         device_data['image_verified'] = 'No'
-
-            InventoryModel.add_device(db, device_data)
-            
-            results.append({
-                'ip': ip,
-                'status': status,
-                'details': details
-            })
-
-        except Exception as e:
-            results.append({
-                'ip': ip,
-                'status': 'Fail',
-                'details': [str(e)]
-            })
-    
     return jsonify({
         'success': True,
         'results': results
     })
 
 
+def _run_precheck_for_ip(ip, device, username, password, enable_password, netconf_port, image_size_cache):
+    """
+    Run the full precheck sequence for a single device, serialized against
+    any other job touching the same device (see app.utils.ip_locks).
+    device is the inventory row fetched in bulk by the caller;
+    image_size_cache maps target image filename -> size in MB (resolved once
+    per bulk run). Returns the per-device result dict for the API response.
+    """
+    with device_lock(ip):
+        return _run_precheck_locked(ip, device, username, password, enable_password,
+                                    netconf_port, image_size_cache)
+
+
+def _run_precheck_locked(ip, device, username, password, enable_password, netconf_port, image_size_cache):
+    try:
+        if not device:
+            return {'ip': ip, 'status': 'Fail', 'details': 'Device not found in inventory'}
+
+        # Target image is guaranteed by validation above
+        target_image = device.get('target_image')
+
+        # Run PreCheckEngine
+        with _db_write_lock:
+            PreChecksModel.clear_checks_for_device(db, ip)
+        precheck = PreCheckEngine(ip, username, password, netconf_port, enable_password)
+
+        # Determine filesystem (pure role lookup, no session)
+        filesystem = NetconfClient.get_filesystem_for_role(device['device_role'])
+
+        # We need a target_version for checking.
+        # PreCheckEngine requires a `target_version` string; we only store
+        # target_image (filename), so extract the version from it.
+        # Image size was resolved once per unique image before the fan-out.
+        target_image_size_mb = image_size_cache.get(target_image, 0)
+
+        target_version = extract_version(target_image) or "Unknown"
+
+        check_results = precheck.run_all_checks(
+            current_version=device['current_version'],
+            target_version=target_version,
+            device_role=device['device_role'],
+            filesystem=filesystem,
+            target_image_filename=target_image,
+            target_image_size_mb=target_image_size_mb
+        )
+
+        # Single pass over the results: collect DB rows, failure/warning
+        # details, and the Image Presence outcome in one sweep
+        pending_rows = []
+        details = []
+        has_warnings = False
+        image_presence_result = None
+        for res in check_results:
+            pending_rows.append((ip, res['check_name'], res['result'], res['message']))
+            if res['result'] == 'WARN':
+                has_warnings = True
+            if res['result'] in ('FAIL', 'WARN'):
+                details.append(f"{res['check_name']}: {res['message']}")
+            if res['check_name'] == 'Image Presence':
+                image_presence_result = res['result']
+
+        # Determine overall status
+        all_passed = precheck.all_checks_passed()
+
+        status = 'Pass'
+        if not all_passed:
+            status = 'Fail'
+        elif has_warnings:
+            status = 'Warning'
+
+        details_str = '; '.join(details) if details else None
+
+        # Derive the image flag updates from the Image Presence outcome;
+        # None leaves the stored flag untouched
+        image_copied = None
+        image_verified = None
+        if image_presence_result == 'PASS':
+            image_copied = 'Yes'
+        elif image_presence_result == 'FAIL':
+            image_copied = 'No'
+            image_verified = 'No'
+
+        with _db_write_lock:
+            # Store results in one transaction instead of a commit per check
+            PreChecksModel.add_checks_bulk(db, pending_rows)
+            # Targeted UPDATE of the changed columns instead of rewriting
+            # the whole inventory row
+            InventoryModel.update_precheck_results(db, ip, status, details_str,
+                                                   image_copied, image_verified)
+
+        result = {
+            'ip': ip,
+            'status': status,
+            'details': details
+        }
+
+        # Cache healthy runs so immediate identical re-runs skip the probes;
+        # failures always re-probe
+        if status in ('Pass', 'Warning'):
+            key = (ip, target_image, device.get('current_version'))
+            with _precheck_cache_lock:
+                _precheck_cache[key] = {'at': time.monotonic(), 'result': result}
+
+        return result
+
+    except Exception as e:
+        return {
+            'ip': ip,
+            'status': 'Fail',
+            'details': [str(e)]
+        }
+
+
 @bulk_ops_bp.route('/api/rediscover', methods=['POST'])
 def rediscover_devices():
     """
@@ -197,74 +259,93 @@ def rediscover_devices():
     username = config['credentials']['ssh_username']
     password = config['credentials']['ssh_password']
     enable_password = config['credentials'].get('enable_password', '')
-    
-    results = []
-    
-    for ip in ip_list:
-        try:
-            ssh = SSHClient(ip, username, password, enable_password)
-            if ssh.connect():
-                version_info = ssh.get_version_info()
-                netconf_state = ssh.check_netconf_status()
-                boot_var = ssh.get_boot_variables()
-                free_space = ssh.get_free_space_mb()
-                
-                if version_info:
-                    device_data = {
-                        'ip_address': ip,
-                        'hostname': version_info.get('hostname', 'Unknown'),
-                        'serial_number': version_info.get('serial_number', 'Unknown'),
-                        'device_role': 'Unknown',
-                        'current_version': version_info.get('version', 'Unknown'),
-                        'rommon_version': version_info.get('rommon_version', 'N/A'),
-                        'config_register': version_info.get('config_register', 'Unknown'),
-                        'status': 'Online',
-                        'netconf_state': netconf_state,
-                        'model': version_info.get('model', 'Unknown'),
-                        'boot_variable': boot_var,
-                        'free_space_mb': free_space,
-                        'image_file': version_info.get('image_file'),
-                        # Preserve existing precheck and image status
-                        'precheck_status': None,
-                        'precheck_details': None,
-                        'target_image': None,
-                        'image_copied': 'No',
-                        'image_verified': 'No',
-                        'is_supported': 'Yes'
-                    }
-                    
-                    # Merge existing device fields to avoid data loss
-                    existing = InventoryModel.get_device(db, ip)
-                    if existing:
-                        device_data['precheck_status'] = existing.get('precheck_status')
-                        device_data['precheck_details'] = existing.get('precheck_details')
-                        device_data['target_image'] = existing.get('target_image')
-                        device_data['image_copied'] = existing.get('image_copied', 'No')
-                        device_data['image_verified'] = existing.get('image_verified', 'No')
-                        device_data['is_supported'] = existing.get('is_supported', 'Yes')
-                        device_data['device_role'] = existing.get('device_role', 'Unknown')
-                        
-                        # Preserve config_register if SSH fallback didn't catch it
-                        if device_data.get('config_register') == 'Unknown':
-                            device_data['config_register'] = existing.get('config_register', 'Unknown')
-                    
-                    InventoryModel.add_device(db, device_data)
-                    results.append({'ip': ip, 'status': 'success'})
-                else:
-                    results.append({'ip': ip, 'status': 'failed', 'error': 'Could not retrieve version info'})
-                
-                ssh.disconnect()
-            else:
-                results.append({'ip': ip, 'status': 'failed', 'error': 'Could not connect'})
-        except Exception as e:
-            results.append({'ip': ip, 'status': 'failed', 'error': str(e)})
-    
+
+    # Rediscovery is SSH-bound per device, so fan out like run_prechecks does.
+    # A dead device cannot stall a worker indefinitely: SSHClient.connect()
+    # uses a 30s connection timeout.
+    futures = [
+        _bulk_executor.submit(_rediscover_one, ip, username, password, enable_password)
+        for ip in ip_list
+    ]
+    results = [future.result() for future in as_completed(futures)]
+
     return jsonify({
         'success': True,
         'results': results
     })
 
 
+def _rediscover_one(ip, username, password, enable_password):
+    """
+    Re-discover a single device over SSH, serialized per device.
+    Returns the per-device result dict for the API response.
+    """
+    with device_lock(ip):
+        return _rediscover_locked(ip, username, password, enable_password)
+
+
+def _rediscover_locked(ip, username, password, enable_password):
+    try:
+        ssh = SSHClient(ip, username, password, enable_password)
+        if ssh.connect():
+            version_info = ssh.get_version_info()
+            netconf_state = ssh.check_netconf_status()
+            boot_var = ssh.get_boot_variables()
+            free_space = ssh.get_free_space_mb()
+
+            if version_info:
+                device_data = {
+                    'ip_address': ip,
+                    'hostname': version_info.get('hostname', 'Unknown'),
+                    'serial_number': version_info.get('serial_number', 'Unknown'),
+                    'device_role': 'Unknown',
+                    'current_version': version_info.get('version', 'Unknown'),
+                    'rommon_version': version_info.get('rommon_version', 'N/A'),
+                    'config_register': version_info.get('config_register', 'Unknown'),
+                    'status': 'Online',
+                    'netconf_state': netconf_state,
+                    'model': version_info.get('model', 'Unknown'),
+                    'boot_variable': boot_var,
+                    'free_space_mb': free_space,
+                    'image_file': version_info.get('image_file'),
+                    # Preserve existing precheck and image status
+                    'precheck_status': None,
+                    'precheck_details': None,
+                    'target_image': None,
+                    'image_copied': 'No',
+                    'image_verified': 'No',
+                    'is_supported': 'Yes'
+                }
+
+                # Merge existing device fields to avoid data loss
+                existing = InventoryModel.get_device(db, ip)
+                if existing:
+                    device_data['precheck_status'] = existing.get('precheck_status')
+                    device_data['precheck_details'] = existing.get('precheck_details')
+                    device_data['target_image'] = existing.get('target_image')
+                    device_data['image_copied'] = existing.get('image_copied', 'No')
+                    device_data['image_verified'] = existing.get('image_verified', 'No')
+                    device_data['is_supported'] = existing.get('is_supported', 'Yes')
+                    device_data['device_role'] = existing.get('device_role', 'Unknown')
+
+                    # Preserve config_register if SSH fallback didn't catch it
+                    if device_data.get('config_register') == 'Unknown':
+                        device_data['config_register'] = existing.get('config_register', 'Unknown')
+
+                with _db_write_lock:
+                    InventoryModel.add_device(db, device_data)
+                result = {'ip': ip, 'status': 'success'}
+            else:
+                result = {'ip': ip, 'status': 'failed', 'error': 'Could not retrieve version info'}
+
+            ssh.disconnect()
+            return result
+        else:
+            return {'ip': ip, 'status': 'failed', 'error': 'Could not connect'}
+    except Exception as e:
+        return {'ip': ip, 'status': 'failed', 'error': str(e)}
+
+
 @bulk_ops_bp.route('/api/devices/<ip>/set-target', methods=['POST'])
 def set_target_image(ip):
     """
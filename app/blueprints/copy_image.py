@@ -5,14 +5,13 @@ Spawns individual jobs per device for better tracking and concurrency.
 
 from flask import Blueprint, request, jsonify
 from app.database.models import InventoryModel, JobsModel
-from app.utils.ssh_client import SSHClient
-from app.utils.job_manager import JobManager
-from app.blueprints.verify_image import execute_verify_job
+from app.utils.ssh_pool import acquire_ssh
+from app.blueprints.verify_image import execute_verify_job, invalidate_verifications
 from app.utils.netconf_client import NetconfClient
-from app.extensions import db, get_config
-import json
+from app.extensions import db, get_config, get_config_cached, get_job_manager
+from app.utils.image_meta import extract_version
+from app.utils.ip_locks import device_lock
 import uuid
-import re
 import time
 from datetime import datetime
 
@@ -20,7 +19,7 @@ copy_image_bp = Blueprint('copy_image', __name__)
 
 # Load config
 config = get_config()
-job_manager = JobManager(config['database']['path'], config['logs']['path'])
+job_manager = get_job_manager()
 
 
 @copy_image_bp.route('/api/operations/copy', methods=['POST'])
@@ -39,27 +38,23 @@ def start_copy_job():
 
     job_ids = []
 
+    # Fetch all devices in one query; avoids a SELECT per IP
+    devices_by_ip = {} if global_target_image else InventoryModel.get_devices_in(db, ip_list)
+
     for ip in ip_list:
         # Determine target image for this specific device
         target_image = global_target_image
         if not target_image:
-            device = InventoryModel.get_device(db, ip)
+            device = devices_by_ip.get(ip)
             if device:
                 target_image = device.get('target_image')
-        
+
         if not target_image:
             # Skip this device if no image selected
             continue
 
         # Extract version from filename if possible
-        target_version = 'N/A'
-        if target_image:
-            # Try to match typical IOS-XE version patterns (e.g. 17.09.05, 16.12.4, 17.3.1a)
-            # Look for versions starting with 16 or 17 to avoid capturing '3k9' type strings
-            # Matches 16.X.X or 17.X.X, optionally followed by letters
-            version_match = re.search(r"(?:^|[^0-9])(1[6-7]\.\d+\.\d+[a-zA-Z0-9]*)", target_image)
-            if version_match:
-                target_version = version_match.group(1)
+        target_version = extract_version(target_image) or 'N/A'
 
         # Create Job ID
         job_id = str(uuid.uuid4())
@@ -96,16 +91,23 @@ def start_copy_job():
 
 def execute_copy_job(job_id, ip_address, image_filename):
     """
-    Execute copy job for a single device
+    Execute copy job for a single device, serialized per device so a copy
+    never races a precheck/rediscovery session on the same switch
     """
+    with device_lock(ip_address):
+        _execute_copy_job_locked(job_id, ip_address, image_filename)
+
+
+def _execute_copy_job_locked(job_id, ip_address, image_filename):
     job_manager.update_job_status(job_id, "Running")
     job_manager.append_log(job_id, f"Stack: Starting image copy for {ip_address}")
     
     try:
-        # Reload config for latest settings
-        with open('config.json', 'r') as f:
-            local_config = json.load(f)
-            
+        # Reload config for latest settings (cached with a short TTL so
+        # parallel copy jobs don't each re-read and re-parse the file)
+        local_config = get_config_cached()
+
+
         username = local_config['credentials']['ssh_username']
         password = local_config['credentials']['ssh_password']
         enable_password = local_config['credentials'].get('enable_password', '')
@@ -115,72 +117,81 @@ def execute_copy_job(job_id, ip_address, image_filename):
         repo_port = local_config.get('repository', {}).get('http_port')
         server_port = repo_port if repo_port else local_config.get('flask', {}).get('port', 5000)
 
-        # Connect
+        # Connect (from the shared pool, so a precheck that just ran against
+        # this device hands us its still-live session)
         job_manager.append_log(job_id, "Connecting via SSH...")
-        ssh = SSHClient(ip_address, username, password, enable_password)
-        
-        if not ssh.connect():
-            job_manager.append_log(job_id, "ERROR: SSH connection failed")
-            job_manager.update_job_status(job_id, "Failed")
-            return
-
-        # Prepare Copy
-        # Determine filesystem based on device role
-        device = InventoryModel.get_device(db, ip_address)
-        device_role = device.get('device_role', 'Access') if device else 'Access'
-        netconf_client = NetconfClient(ip_address, 830, username, password)
-        destination_fs = netconf_client.get_filesystem_for_role(device_role)
-        
-        # Handle default HTTP port 80 (Docker/standard web server)
-        # IOS-XE devices often prefer 'http://ip/file' over 'http://ip:80/file'
-        if str(server_port) == '80':
-            http_url = f"http://{server_ip}/repo/{image_filename}"
-        else:
-            http_url = f"http://{server_ip}:{server_port}/repo/{image_filename}"
-        
-        job_manager.append_log(job_id, f"Checking if file {image_filename} already exists...")
-        if ssh.check_file_exists(destination_fs, image_filename):
-             job_manager.append_log(job_id, f"File {image_filename} already exists on {destination_fs}. Overwriting...")
-             # We proceed to copy/overwrite as requested, or should we skip?
-             # Usually 'Copy Image' implies intent to copy. 
-             # The ssh_client.copy_file_from_http handles overwrite prompts.
-
-        # Define callback for real-time logging
-        def log_callback(message):
-            job_manager.append_log(job_id, message)
-
-        job_manager.append_log(job_id, f"Initiating copy from {http_url}...")
-        
-        # Execute copy with callback
-        result = ssh.copy_file_from_http(http_url, destination_fs, callback=log_callback)
-        
-        if result['success']:
-            # job_manager.append_log(job_id, f"Output: {result.get('output', '')}") # Already logged via callback
-            job_manager.append_log(job_id, "✅ Copy successful!")
-            
-            # Verify file size/integrity check to ensure it's not a 0-byte file
-            # (Basic check, full verification is separate)
-            job_manager.append_log(job_id, "Verifying file presence...")
-            time.sleep(2) # Give file system a moment to settle
+        with acquire_ssh(ip_address, username, password, enable_password) as ssh:
+            if ssh is None:
+                job_manager.append_log(job_id, "ERROR: SSH connection failed")
+                job_manager.update_job_status(job_id, "Failed")
+                return
+
+            # Prepare Copy
+            # Determine filesystem based on device role
+            device = InventoryModel.get_device(db, ip_address)
+            device_role = device.get('device_role', 'Access') if device else 'Access'
+            destination_fs = NetconfClient.get_filesystem_for_role(device_role)
+
+            # Handle default HTTP port 80 (Docker/standard web server)
+            # IOS-XE devices often prefer 'http://ip/file' over 'http://ip:80/file'
+            if str(server_port) == '80':
+                http_url = f"http://{server_ip}/repo/{image_filename}"
+            else:
+                http_url = f"http://{server_ip}:{server_port}/repo/{image_filename}"
+
+            job_manager.append_log(job_id, f"Checking if file {image_filename} already exists...")
             if ssh.check_file_exists(destination_fs, image_filename):
-                 job_manager.append_log(job_id, "File confirmed present on filesystem.")
-                 InventoryModel.set_image_copied(db, ip_address, 'Yes')
-                 InventoryModel.set_image_verified(db, ip_address, 'No') # Reset verification
-                 
-                 # Chain Verification
-                 ssh.disconnect() # Disconnect before verify starts its own connection
-                 job_manager.append_log(job_id, "Starting verification phase...")
-                 execute_verify_job(job_id, ip_address, image_filename)
-                 return # Verify job handles status updates
+                 job_manager.append_log(job_id, f"File {image_filename} already exists on {destination_fs}. Overwriting...")
+                 # We proceed to copy/overwrite as requested, or should we skip?
+                 # Usually 'Copy Image' implies intent to copy.
+                 # The ssh_client.copy_file_from_http handles overwrite prompts.
+
+            # Define callback for real-time logging
+            def log_callback(message):
+                job_manager.append_log(job_id, message)
+
+            job_manager.append_log(job_id, f"Initiating copy from {http_url}...")
+
+            # The file on flash is about to be rewritten - any cached
+            # verification for this pair is no longer trustworthy
+            invalidate_verifications(image_filename, ip_address)
+
+            # Execute copy with callback
+            result = ssh.copy_file_from_http(http_url, destination_fs, callback=log_callback)
+
+            if result['success']:
+                # job_manager.append_log(job_id, f"Output: {result.get('output', '')}") # Already logged via callback
+                job_manager.append_log(job_id, "✅ Copy successful!")
+
+                # Verify file size/integrity check to ensure it's not a 0-byte file
+                # (Basic check, full verification is separate)
+                job_manager.append_log(job_id, "Verifying file presence...")
+                # Poll instead of a fixed sleep: the file is usually visible almost
+                # immediately, so exit early and only wait up to ~2s worst case.
+                file_present = False
+                for _ in range(10):
+                    if ssh.check_file_exists(destination_fs, image_filename):
+                        file_present = True
+                        break
+                    time.sleep(0.2)
+                if file_present:
+                     job_manager.append_log(job_id, "File confirmed present on filesystem.")
+                     InventoryModel.set_image_copied(db, ip_address, 'Yes')
+                     InventoryModel.set_image_verified(db, ip_address, 'No') # Reset verification
+
+                     # Chain Verification, handing over the live SSH session so the
+                     # verify phase doesn't pay a second handshake. The session
+                     # goes back to the pool when this context exits.
+                     job_manager.append_log(job_id, "Starting verification phase...")
+                     execute_verify_job(job_id, ip_address, image_filename, ssh=ssh)
+                     return # Verify job handles status updates
+                else:
+                     job_manager.append_log(job_id, "❌ ERROR: File copy reported success but file not found!")
+                     job_manager.update_job_status(job_id, "Failed")
             else:
-                 job_manager.append_log(job_id, "❌ ERROR: File copy reported success but file not found!")
-                 job_manager.update_job_status(job_id, "Failed")
-        else:
-            job_manager.append_log(job_id, f"❌ Copy failed: {result.get('error')}")
-            job_manager.append_log(job_id, f"Output: {result.get('output')}")
-            job_manager.update_job_status(job_id, "Failed")
-
-        ssh.disconnect()
+                job_manager.append_log(job_id, f"❌ Copy failed: {result.get('error')}")
+                job_manager.append_log(job_id, f"Output: {result.get('output')}")
+                job_manager.update_job_status(job_id, "Failed")
 
     except Exception as e:
         job_manager.append_log(job_id, f"CRITICAL ERROR: {str(e)}")
@@ -2,68 +2,169 @@
 Discovery blueprint for device discovery and NETCONF management
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import orjson
 from app.database.models import Database, InventoryModel, JobsModel, PreChecksModel
 from app.utils.netconf_client import NetconfClient
-from app.utils.ssh_client import SSHClient
+from app.utils.ssh_pool import acquire_ssh
+from app.utils.ip_locks import device_lock
+import ipaddress
 import json
+import logging
 import os
-import glob
 import re
+import threading
+from functools import lru_cache
 
 discovery_bp = Blueprint('discovery', __name__)
 
-# Load config helper
+# Lazy %s formatting means suppressed levels skip the argument rendering
+# entirely (the device_data debug dumps are expensive to format)
+log = logging.getLogger(__name__)
+
+# Serializes sqlite writes from parallel discovery/toggle workers
+_db_write_lock = threading.Lock()
+
+# Sanity checks for the NETCONF-reported software version: a hardware
+# revision like 'V00' or anything not starting with 'X.Y' is not a usable
+# software version and triggers the SSH fallback
+_HW_REV_RE = re.compile(r'^V\d+$')
+_SW_VER_RE = re.compile(r'^\d+\.\d+')
+
+
+def _json_response(payload):
+    """
+    Serialize with orjson instead of Flask's stdlib-json jsonify - large
+    inventories make encoding a visible slice of response time
+    """
+    return current_app.response_class(orjson.dumps(payload), mimetype='application/json')
+
+# Load config helper. The parsed dict is cached against the file mtime so
+# per-request reloads cost one stat() instead of an open + JSON parse.
+_CFG_CACHE = {}
+_CFG_MTIME = None
+
 def get_config():
+    global _CFG_CACHE, _CFG_MTIME
     try:
-        with open('config.json', 'r') as f:
-            return json.load(f)
+        mtime = os.path.getmtime('config.json')
+        if mtime != _CFG_MTIME:
+            with open('config.json', 'r') as f:
+                _CFG_CACHE = json.load(f)
+            _CFG_MTIME = mtime
+        return _CFG_CACHE
     except Exception as e:
-        print(f"Error loading config: {e}")
+        log.error('Error loading config: %s', e)
         return {}
 
-# Initialize DB with initial config
-initial_config = get_config()
-db = Database(initial_config.get('database', {}).get('path', 'app/database/network_inventory.db'))
+# DB handle, created on first use so importing the blueprint never
+# touches the filesystem (supported models load the same way below)
+_db = None
+
+def get_db():
+    global _db
+    if _db is None:
+        _db = Database(get_config().get('database', {}).get('path', 'app/database/network_inventory.db'))
+    return _db
 
 # Load supported models patterns
 SUPPORTED_MODELS_CACHE = []
+# Single alternation regex over all model patterns, plus a parallel list
+# mapping the matched alternative back to its series' image regex string
+_COMBINED_MODEL_PATTERN = None
+_FLAT_IMAGE_REGEX = []
+_MODELS_MTIME = None
+# First literal character of every pattern; a model whose first character
+# is not in this set can be rejected without running the regex at all.
+# None disables the guard (some pattern has no literal prefix).
+_MODEL_FIRST_CHARS = None
+
+
+def _leading_literal_char(pattern):
+    """Return the pattern's leading literal character, or None"""
+    stripped = pattern.lstrip('^')
+    if stripped and (stripped[0].isalnum() or stripped[0] in '_-'):
+        return stripped[0].upper()
+    return None
+
 
 def load_supported_models():
     """Load supported models patterns from config file"""
-    global SUPPORTED_MODELS_CACHE
+    global SUPPORTED_MODELS_CACHE, _COMBINED_MODEL_PATTERN, _FLAT_IMAGE_REGEX, _MODELS_MTIME, _MODEL_FIRST_CHARS
     try:
+        # Skip the re-parse (and cache invalidation) if the file is unchanged
+        mtime = os.path.getmtime('supported_models.json')
+        if mtime == _MODELS_MTIME and SUPPORTED_MODELS_CACHE:
+            return
         with open('supported_models.json', 'r') as f:
             data = json.load(f)
             patterns = []
+            flat_patterns = []
+            flat_image_regex = []
             for family in data.get('models', []):
                 for series in family.get('series', []):
+                    image_format = series.get('image_format', '')
+                    if image_format:
+                        # Convert format string to regex once at load time
+                        # e.g., cat9k_iosxe.<release>.SPA.bin -> ^cat9k_iosxe\..*\.SPA\.bin$
+                        image_regex = '^' + re.escape(image_format).replace(re.escape('<release>'), '.*') + '$'
+                    else:
+                        image_regex = None
                     # Store as object with patterns and image_format
                     patterns.append({
                         'patterns': series.get('patterns', []),
-                        'image_format': series.get('image_format', '')
+                        'image_format': image_format
                     })
+                    for p in series.get('patterns', []):
+                        flat_patterns.append(p)
+                        flat_image_regex.append(image_regex)
             SUPPORTED_MODELS_CACHE = patterns
+            _FLAT_IMAGE_REGEX = flat_image_regex
+            # One C-level match against the combined alternation replaces
+            # a Python-level loop over every family x pattern per device row.
+            # The named group that fired identifies the series.
+            if flat_patterns:
+                _COMBINED_MODEL_PATTERN = re.compile(
+                    '(?:' + '|'.join(f'(?P<g{i}>{p})' for i, p in enumerate(flat_patterns)) + ')',
+                    re.IGNORECASE
+                )
+            else:
+                _COMBINED_MODEL_PATTERN = None
+            first_chars = [_leading_literal_char(p) for p in flat_patterns]
+            _MODEL_FIRST_CHARS = frozenset(first_chars) if all(first_chars) else None
+            _MODELS_MTIME = mtime
     except Exception as e:
-        print(f"Error loading supported models: {e}")
+        log.error('Error loading supported models: %s', e)
+        _MODELS_MTIME = None
         SUPPORTED_MODELS_CACHE = []
+        _COMBINED_MODEL_PATTERN = None
+        _FLAT_IMAGE_REGEX = []
+        _MODEL_FIRST_CHARS = None
+    # Memoized results are tied to the loaded pattern set - drop them on reload
+    is_model_supported.cache_clear()
+    get_image_regex_for_model.cache_clear()
 
+@lru_cache(maxsize=1024)
 def is_model_supported(model_name):
     """Check if model is supported based on regex patterns"""
     if not SUPPORTED_MODELS_CACHE:
         load_supported_models()
-    
+
     # If model is Unknown, it's not supported
     if not model_name or model_name == 'Unknown':
         return 'No'
-        
-    for entry in SUPPORTED_MODELS_CACHE:
-        for pattern in entry.get('patterns', []):
-            if re.match(pattern, model_name, re.IGNORECASE):
-                return 'Yes'
-            
+
+    # Cheap first-character rejection before touching the regex engine
+    if _MODEL_FIRST_CHARS is not None and model_name[0].upper() not in _MODEL_FIRST_CHARS:
+        return 'No'
+
+    if _COMBINED_MODEL_PATTERN and _COMBINED_MODEL_PATTERN.match(model_name):
+        return 'Yes'
+
     return 'No'
 
+@lru_cache(maxsize=1024)
 def get_image_regex_for_model(model_name):
     """Get regex for compatible images based on model"""
     if not SUPPORTED_MODELS_CACHE:
@@ -72,19 +173,18 @@ def get_image_regex_for_model(model_name):
     if not model_name or model_name == 'Unknown':
         return None
 
-    for entry in SUPPORTED_MODELS_CACHE:
-        for pattern in entry.get('patterns', []):
-            if re.match(pattern, model_name, re.IGNORECASE):
-                image_format = entry.get('image_format', '')
-                if image_format:
-                    # Convert format string to regex
-                    # e.g., cat9k_iosxe.<release>.SPA.bin -> ^cat9k_iosxe\..*\.SPA\.bin$
-                    # Escape dots
-                    regex = re.escape(image_format)
-                    # Replace <release> with .*
-                    regex = regex.replace(re.escape('<release>'), '.*')
-                    return f"^{regex}$"
-    return None
+    if _MODEL_FIRST_CHARS is not None and model_name[0].upper() not in _MODEL_FIRST_CHARS:
+        return None
+
+    if not _COMBINED_MODEL_PATTERN:
+        return None
+
+    match = _COMBINED_MODEL_PATTERN.match(model_name)
+    if not match or match.lastgroup is None:
+        return None
+
+    # lastgroup is the alternative that fired, e.g. 'g3' -> index 3
+    return _FLAT_IMAGE_REGEX[int(match.lastgroup[1:])]
 
 @discovery_bp.route('/api/discover', methods=['POST'])
 def discover_devices():
@@ -92,68 +192,144 @@ def discover_devices():
     Discover devices from provided IP list
     Request body: {"ip_list": ["10.10.20.1", "10.10.20.2"]}
     """
-    data = request.get_json()
-    ip_list = data.get('ip_list', [])
-    
+    data = request.get_json(silent=True) or {}
+    ip_list = data.get('ip_list') or []
+
     if not ip_list:
         return jsonify({'error': 'No IP addresses provided'}), 400
-    
+
+    # Drop duplicates (preserving order) and fail fast on malformed
+    # addresses before any SSH/NETCONF session is spun up
+    ip_list = list(dict.fromkeys(ip_list))
+    invalid = [ip for ip in ip_list if not _is_valid_ip(ip)]
+    if invalid:
+        return jsonify({'error': f'Invalid IP addresses: {", ".join(str(i) for i in invalid)}'}), 400
+
+    # Process in sorted order - bulk inserts then touch inventory pages in
+    # primary-key order - but respond in the caller's order below
+    original_order = ip_list
+    ip_list = sorted(ip_list)
+
     # Reload config to get latest credentials
     config = get_config()
-    
+
+    # Probes are I/O bound (NETCONF/SSH handshakes and command round-trips),
+    # so fan out across a bounded pool and reassemble in request order
+    max_workers = config.get('discovery', {}).get('workers', 16)
+
+    # One IN query for the carry-over fields instead of a SELECT per IP
+    existing_map = InventoryModel.get_devices_in(get_db(), ip_list)
+
+    results_by_ip = {}
+    pending_by_ip = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='discover') as executor:
+        futures = {executor.submit(_probe_one, ip, config, existing_map.get(ip)): ip for ip in ip_list}
+        for future in as_completed(futures):
+            ip = futures[future]
+            probe_results, pending = future.result()
+            results_by_ip[ip] = probe_results
+            if pending:
+                pending_by_ip[ip] = pending
+
+    # Flush all discovered devices in one transaction instead of one
+    # commit (and fsync) per device
+    if pending_by_ip:
+        rows = [device_data for entries in pending_by_ip.values() for device_data, _ in entries]
+        with _db_write_lock:
+            inserted = InventoryModel.add_devices_bulk(get_db(), rows)
+        for ip, entries in pending_by_ip.items():
+            for _, method in entries:
+                if inserted:
+                    results_by_ip[ip].append({'ip': ip, 'status': 'success', 'method': method})
+                else:
+                    results_by_ip[ip].append({'ip': ip, 'status': 'failed', 'error': 'Database insertion failed (Check server logs)'})
+
     results = []
+    for ip in original_order:
+        results.extend(results_by_ip.get(ip, []))
+
+    return _json_response({'results': results})
+
+
+def _is_valid_ip(value):
+    """True if value parses as an IPv4/IPv6 address"""
+    try:
+        ipaddress.ip_address(str(value).strip())
+        return True
+    except ValueError:
+        return False
+
+
+def _carryover(existing):
+    """User-driven fields preserved from an existing row across rediscovery"""
+    keys = ('precheck_status', 'precheck_details', 'target_image', 'image_copied', 'image_verified')
+    defaults = {'image_copied': 'No', 'image_verified': 'No'}
+    if existing:
+        return {k: existing.get(k, defaults.get(k)) for k in keys}
+    return {k: defaults.get(k) for k in keys}
+
+
+def _probe_one(ip, config, existing_dev=None):
+    """
+    Discover a single device, serialized per IP via the shared device lock.
+    Returns (results, pending): the immediate result entries for this IP
+    plus (device_data, method) rows to be flushed to the DB in one batch.
+    """
     username = config['credentials']['ssh_username']
     password = config['credentials']['ssh_password']
     enable_password = config['credentials'].get('enable_password', '')
     netconf_port = config['credentials']['netconf_port']
-    
-    for ip in ip_list:
-        try:
-            # Try NETCONF first
-            netconf = NetconfClient(ip, netconf_port, username, password)
-            netconf_success = False
-            
-            if netconf.connect():
-                # Get hardware info
-                hardware_info = netconf.get_device_hardware()
-                system_info = netconf.get_system_info()
-                filesystem_info = netconf.get_filesystem_info()
-                boot_info = netconf.get_boot_variables()
+
+    with device_lock(ip):
+        return _discover_device(ip, username, password, enable_password, netconf_port, existing_dev)
+
+
+def _discover_device(ip, username, password, enable_password, netconf_port, existing_dev=None):
+    results = []
+    pending = []
+    try:
+        # Try NETCONF first
+        netconf = NetconfClient(ip, netconf_port, username, password)
+        netconf_success = False
+
+        if netconf.connect():
+            # Get hardware info
+            hardware_info = netconf.get_device_hardware()
+            system_info = netconf.get_system_info()
+            filesystem_info = netconf.get_filesystem_info()
+            boot_info = netconf.get_boot_variables()
                 
-                if hardware_info and system_info:
-                    # Determine device role
-                    device_role = netconf.determine_device_role(hardware_info['part_number'])
-                    
-                    # Check for existing device
-                    existing_dev = InventoryModel.get_device(db, ip)
-                    
-                    free_space_mb = int(filesystem_info.get('available_gb', 0) * 1024) if filesystem_info else None
-                    boot_variable = boot_info.get('boot_system') if boot_info else None
-                    config_register = boot_info.get('config_register') if boot_info else 'Unknown'
-                    if config_register == 'Unknown':
-                        config_register = None
-
-                    # Compute initial version from NETCONF hardware info
-                    # (hardware 'version' field is often a HW revision like 'V00', not the SW version)
-                    actual_version = hardware_info.get('sw_version')
-                    if not actual_version or actual_version == 'Unknown':
-                        actual_version = system_info.get('version', 'Unknown')
+            if hardware_info and system_info:
+                # Determine device role
+                device_role = netconf.determine_device_role(hardware_info['part_number'])
+
+                free_space_mb = int(filesystem_info.get('available_gb', 0) * 1024) if filesystem_info else None
+                boot_variable = boot_info.get('boot_system') if boot_info else None
+                config_register = boot_info.get('config_register') if boot_info else 'Unknown'
+                if config_register == 'Unknown':
+                    config_register = None
+
+                # Compute initial version from NETCONF hardware info
+                # (hardware 'version' field is often a HW revision like 'V00', not the SW version)
+                actual_version = hardware_info.get('sw_version')
+                if not actual_version or actual_version == 'Unknown':
+                    actual_version = system_info.get('version', 'Unknown')
                     
-                    # If C8000V/CSR1000V virtualization models return empty, selectively fallback to SSH
-                    # Also fall back for sw_version when it looks like a hardware revision (e.g. 'V00')
-                    # or a full Cisco IOS banner string (e.g. 'Cisco IOS Software [Bengaluru]...')
-                    import re as _re
-                    hw_version_looks_invalid = (
-                        not actual_version
-                        or actual_version == 'Unknown'
-                        or bool(_re.match(r'^V\d+$', str(actual_version).strip()))
-                        or not bool(_re.match(r'^\d+\.\d+', str(actual_version).strip()))  # not a clean X.X version
-                    )
-                    ssh_version_info = None
-                    if free_space_mb is None or boot_variable is None or config_register is None or hw_version_looks_invalid:
-                        print(f"[INFO] NETCONF succeeded for {ip} but missing partial data (version={actual_version}). Falling back to SSH for missing fields.")
-                        ssh_fallback = SSHClient(ip, username, password, enable_password)
-                        if ssh_fallback.connect():
+                # If C8000V/CSR1000V virtualization models return empty, selectively fallback to SSH
+                # Also fall back for sw_version when it looks like a hardware revision (e.g. 'V00')
+                # or a full Cisco IOS banner string (e.g. 'Cisco IOS Software [Bengaluru]...')
+                version_str = str(actual_version or '').strip()
+                hw_version_looks_invalid = (
+                    not version_str
+                    or version_str == 'Unknown'
+                    or bool(_HW_REV_RE.match(version_str))
+                    or not bool(_SW_VER_RE.match(version_str))  # not a clean X.X version
+                )
+                ssh_version_info = None
+                if free_space_mb is None or boot_variable is None or config_register is None or hw_version_looks_invalid:
+                    log.info('NETCONF succeeded for %s but missing partial data (version=%s). Falling back to SSH for missing fields.', ip, actual_version)
+                    with acquire_ssh(ip, username, password, enable_password) as ssh_fallback:
+                        if ssh_fallback:
                             if free_space_mb is None:
                                 free_space_mb = ssh_fallback.get_free_space_mb()
                             if boot_variable is None:
@@ -165,112 +341,81 @@ def discover_devices():
                                 config_register = ssh_version_info.get('config_register', 'Unknown')
                             if hw_version_looks_invalid and ssh_version_info:
                                 actual_version = ssh_version_info.get('version', actual_version)
-                            ssh_fallback.disconnect()
 
-                    # Derive ROMMON from SSH version info if available, otherwise N/A
-                    rommon_version = (ssh_version_info.get('rommon_version', 'N/A') if ssh_version_info else 'N/A')
+                # Derive ROMMON from SSH version info if available, otherwise N/A
+                rommon_version = (ssh_version_info.get('rommon_version', 'N/A') if ssh_version_info else 'N/A')
 
+                device_data = {
+                    'ip_address': ip,
+                    'hostname': system_info.get('hostname', 'Unknown'),
+                    'serial_number': hardware_info.get('serial_number', 'Unknown'),
+                    'device_role': device_role,
+                    'current_version': actual_version,
+                    'rommon_version': rommon_version,
+                    'config_register': config_register,
+                    'status': 'Online',
+                    'netconf_state': 'Enabled',
+                    'model': hardware_info.get('part_number', 'Unknown'),
+                    'boot_variable': boot_variable,
+                    'free_space_mb': free_space_mb,
+                    'image_file': str(boot_variable).split(',')[0] if boot_variable else None,
+                    'is_supported': is_model_supported(hardware_info.get('part_number', 'Unknown')),
+                    **_carryover(existing_dev)
+                }
+                    
+                # Queue for the single batched insert after the fan-out
+                log.debug('Adding device %s with data: %s', ip, device_data)
+                pending.append((device_data, 'NETCONF'))
+                netconf_success = True
+            else:
+                log.warning('NETCONF connected to %s but could not retrieve device info (likely insufficient privileges). Falling back to SSH.', ip)
+                
+            netconf.disconnect()
+            
+        # Fallback to SSH if NETCONF failed to connect or retrieve data
+        if not netconf_success:
+            with acquire_ssh(ip, username, password, enable_password) as ssh:
+                if ssh is None:
+                    results.append({'ip': ip, 'status': 'failed', 'error': 'Connection failed'})
+                    return results, pending
+
+                version_info = ssh.get_version_info()
+
+                # Check actual NETCONF status on the device
+                netconf_state = ssh.check_netconf_status()
+
+                # Collect boot variables and free space
+                boot_var = ssh.get_boot_variables()
+                free_space = ssh.get_free_space_mb()
+
+                if version_info:
                     device_data = {
                         'ip_address': ip,
-                        'hostname': system_info.get('hostname', 'Unknown'),
-                        'serial_number': hardware_info.get('serial_number', 'Unknown'),
-                        'device_role': device_role,
-                        'current_version': actual_version,
-                        'rommon_version': rommon_version,
-                        'config_register': config_register,
+                        'hostname': version_info.get('hostname', 'Unknown'),
+                        'serial_number': version_info.get('serial_number', 'Unknown'),
+                        'device_role': netconf.determine_device_role(version_info.get('model', 'Unknown')),
+                        'current_version': version_info.get('version', 'Unknown'),
+                        'rommon_version': 'N/A',
+                        'config_register': version_info.get('config_register', 'Unknown'),
                         'status': 'Online',
-                        'netconf_state': 'Enabled',
-                        'model': hardware_info.get('part_number', 'Unknown'),
-                        'boot_variable': boot_variable,
-                        'free_space_mb': free_space_mb,
-                        'image_file': str(boot_variable).split(',')[0] if boot_variable else None,
-                        'precheck_status': existing_dev.get('precheck_status') if existing_dev else None,
-                        'precheck_details': existing_dev.get('precheck_details') if existing_dev else None,
-                        'target_image': existing_dev.get('target_image') if existing_dev else None,
-                        'image_copied': existing_dev.get('image_copied', 'No') if existing_dev else 'No',
-                        'image_verified': existing_dev.get('image_verified', 'No') if existing_dev else 'No',
-                        'is_supported': is_model_supported(hardware_info.get('part_number', 'Unknown'))
+                        'netconf_state': netconf_state,  # Use actual status from device
+                        'model': version_info.get('model', 'Unknown'),
+                        'boot_variable': boot_var,
+                        'free_space_mb': free_space,
+                        'image_file': version_info.get('image_file'),
+                        'rommon_version': version_info.get('rommon_version', 'N/A'),
+                        'is_supported': is_model_supported(version_info.get('model', 'Unknown')),
+                        **_carryover(existing_dev)
                     }
-                    
-                    # Add to database
-                    print(f"DEBUG: Adding device {ip} with data: {device_data}")
-                    try:
-                        if InventoryModel.add_device(db, device_data):
-                            results.append({'ip': ip, 'status': 'success', 'method': 'NETCONF'})
-                            netconf_success = True
-                        else:
-                            print(f"ERROR: Failed to add device {ip} to database")
-                            results.append({'ip': ip, 'status': 'failed', 'error': 'Database insertion failed (Check server logs)'})
-                            netconf_success = False
-                    except Exception as e:
-                        print(f"ERROR: Exception adding device {ip}: {e}")
-                        results.append({'ip': ip, 'status': 'failed', 'error': f'Database error: {str(e)}'})
-                        netconf_success = False
-                else:
-                    print(f"[WARN] NETCONF connected to {ip} but could not retrieve device info (likely insufficient privileges). Falling back to SSH.")
-                
-                netconf.disconnect()
-            
-            # Fallback to SSH if NETCONF failed to connect or retrieve data
-            if not netconf_success:
-                ssh = SSHClient(ip, username, password, enable_password)
-                if ssh.connect():
-                    version_info = ssh.get_version_info()
-                    
-                    # Check actual NETCONF status on the device
-                    netconf_state = ssh.check_netconf_status()
-                    
-                    # Collect boot variables and free space
-                    boot_var = ssh.get_boot_variables()
-                    free_space = ssh.get_free_space_mb()
-                    
-                    if version_info:
-                        # Check for existing device to preserve user settings
-                        existing_dev = InventoryModel.get_device(db, ip)
-                        
-                        device_data = {
-                            'ip_address': ip,
-                            'hostname': version_info.get('hostname', 'Unknown'),
-                            'serial_number': version_info.get('serial_number', 'Unknown'),
-                            'device_role': netconf.determine_device_role(version_info.get('model', 'Unknown')),
-                            'current_version': version_info.get('version', 'Unknown'),
-                            'rommon_version': 'N/A',
-                            'config_register': version_info.get('config_register', 'Unknown'),
-                            'status': 'Online',
-                            'netconf_state': netconf_state,  # Use actual status from device
-                            'model': version_info.get('model', 'Unknown'),
-                            'boot_variable': boot_var,
-                            'free_space_mb': free_space,
-                            'image_file': version_info.get('image_file'),
-                            'rommon_version': version_info.get('rommon_version', 'N/A'),
-                            'precheck_status': existing_dev.get('precheck_status') if existing_dev else None,
-                            'precheck_details': existing_dev.get('precheck_details') if existing_dev else None,
-                            'target_image': existing_dev.get('target_image') if existing_dev else None,
-                            'image_copied': existing_dev.get('image_copied', 'No') if existing_dev else 'No',
-                            'image_verified': existing_dev.get('image_verified', 'No') if existing_dev else 'No',
-                            'is_supported': is_model_supported(version_info.get('model', 'Unknown'))
-                        }
-                        
-                        print(f"DEBUG: Adding device {ip} (SSH) with data: {device_data}")
-                        try:
-                            if InventoryModel.add_device(db, device_data):
-                                results.append({'ip': ip, 'status': 'success', 'method': 'SSH'})
-                            else:
-                                print(f"ERROR: Failed to add device {ip} (SSH) to database")
-                                results.append({'ip': ip, 'status': 'failed', 'error': 'Database insertion failed (Check server logs)'})
-                        except Exception as e:
-                            print(f"ERROR: Exception adding device {ip} (SSH): {e}")
-                            results.append({'ip': ip, 'status': 'failed', 'error': f'Database error: {str(e)}'})
-                    else:
-                        results.append({'ip': ip, 'status': 'failed', 'error': 'Could not retrieve version info'})
-                    
-                    ssh.disconnect()
+
+                    log.debug('Adding device %s (SSH) with data: %s', ip, device_data)
+                    pending.append((device_data, 'SSH'))
                 else:
-                    results.append({'ip': ip, 'status': 'failed', 'error': 'Connection failed'})
-        except Exception as e:
-            results.append({'ip': ip, 'status': 'failed', 'error': str(e)})
-    
-    return jsonify({'results': results})
+                    results.append({'ip': ip, 'status': 'failed', 'error': 'Could not retrieve version info'})
+    except Exception as e:
+        results.append({'ip': ip, 'status': 'failed', 'error': str(e)})
+
+    return results, pending
 
 
 @discovery_bp.route('/api/netconf/sync-state', methods=['POST'])
@@ -280,17 +425,16 @@ def sync_netconf_state():
     Body: {"ip": "10.10.20.1", "netconf_state": "Enabled"}
     Used to reconcile DB with the live state discovered via SSH check.
     """
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     ip = data.get('ip', '').strip()
     state = data.get('netconf_state', '').strip()
 
     if not ip or state not in ('Enabled', 'Disabled'):
         return jsonify({'error': 'ip and valid netconf_state required'}), 400
 
-    db = Database()
-    success = InventoryModel.update_netconf_state(db, ip, state)
+    success = InventoryModel.update_netconf_state(get_db(), ip, state)
     if success:
-        print(f"[INFO] /api/netconf/sync-state: updated {ip} → {state} in DB")
+        log.info('/api/netconf/sync-state: updated %s → %s in DB', ip, state)
         return jsonify({'ip': ip, 'netconf_state': state, 'updated': True})
     else:
         return jsonify({'error': 'DB update failed'}), 500
@@ -313,18 +457,17 @@ def get_netconf_status():
     enable_password = config['credentials'].get('enable_password', '')
 
     try:
-        ssh = SSHClient(ip, username, password, enable_password)
-        if ssh.connect():
-            print(f"[INFO] /api/netconf/status: SSH connected to {ip}, checking state...")
-            state = ssh.check_netconf_status()
-            ssh.disconnect()
-            print(f"[INFO] /api/netconf/status: {ip} → {state}")
-            return jsonify({'ip': ip, 'netconf_state': state})
-        else:
-            print(f"[WARN] /api/netconf/status: SSH connection failed to {ip}")
-            return jsonify({'ip': ip, 'netconf_state': 'Unknown', 'error': 'SSH connection failed'})
+        with acquire_ssh(ip, username, password, enable_password) as ssh:
+            if ssh:
+                log.info('/api/netconf/status: SSH connected to %s, checking state...', ip)
+                state = ssh.check_netconf_status()
+                log.info('/api/netconf/status: %s → %s', ip, state)
+                return jsonify({'ip': ip, 'netconf_state': state})
+            else:
+                log.warning('/api/netconf/status: SSH connection failed to %s', ip)
+                return jsonify({'ip': ip, 'netconf_state': 'Unknown', 'error': 'SSH connection failed'})
     except Exception as e:
-        print(f"[ERROR] /api/netconf/status: {ip} → {e}")
+        log.error('/api/netconf/status: %s → %s', ip, e)
         return jsonify({'ip': ip, 'netconf_state': 'Unknown', 'error': str(e)}), 500
 
 
@@ -334,25 +477,41 @@ def toggle_netconf():
     Enable or disable NETCONF on selected devices
     Request body: {"ip_list": ["10.10.20.1"], "action": "enable"}
     """
-    data = request.get_json()
-    ip_list = data.get('ip_list', [])
+    data = request.get_json(silent=True) or {}
+    ip_list = data.get('ip_list') or []
     action = data.get('action', 'enable')
-    
+
     if not ip_list:
         return jsonify({'error': 'No IP addresses provided'}), 400
     
+    # Dedupe and process in sorted order, respond in the caller's order
+    original_order = list(dict.fromkeys(ip_list))
+    ip_list = sorted(original_order)
+
     # Reload config
     config = get_config()
+
+    # Like discovery, toggling is dominated by SSH round-trips - fan out
+    max_workers = config.get('discovery', {}).get('workers', 16)
+    results_by_ip = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='toggle') as executor:
+        futures = {executor.submit(_toggle_one, ip, action, config): ip for ip in ip_list}
+        for future in as_completed(futures):
+            results_by_ip[futures[future]] = future.result()
+
+    results = [results_by_ip[ip] for ip in original_order if ip in results_by_ip]
+    return _json_response({'results': results})
+
+
+def _toggle_one(ip, action, config):
+    """Toggle NETCONF on a single device, serialized per IP"""
     username = config['credentials']['ssh_username']
     password = config['credentials']['ssh_password']
     enable_password = config['credentials'].get('enable_password', '')
-    
-    results = []
-    
-    for ip in ip_list:
-        try:
-            ssh = SSHClient(ip, username, password, enable_password)
-            if ssh.connect():
+
+    try:
+        with device_lock(ip), acquire_ssh(ip, username, password, enable_password) as ssh:
+            if ssh:
                 if action == 'toggle':
                     current_state = ssh.check_netconf_status()
                     if current_state == 'Enabled':
@@ -367,66 +526,74 @@ def toggle_netconf():
                 else:
                     success = ssh.disable_netconf()
                     new_state = 'Disabled' if success else 'Enabled'
-                
+
                 # Update database
-                InventoryModel.update_netconf_state(db, ip, new_state)
-                
-                results.append({
+                with _db_write_lock:
+                    InventoryModel.update_netconf_state(get_db(), ip, new_state)
+
+                return {
                     'ip': ip,
                     'status': 'success' if success else 'failed',
                     'netconf_state': new_state
-                })
-                
-                ssh.disconnect()
+                }
             else:
-                results.append({'ip': ip, 'status': 'failed', 'error': 'Connection failed'})
-        except Exception as e:
-            results.append({'ip': ip, 'status': 'failed', 'error': str(e)})
-    
-    return jsonify({'results': results})
+                return {'ip': ip, 'status': 'failed', 'error': 'Connection failed'}
+    except Exception as e:
+        return {'ip': ip, 'status': 'failed', 'error': str(e)}
 
 
 @discovery_bp.route('/api/inventory', methods=['GET'])
 def get_inventory():
     """Get all devices from inventory"""
-    devices = InventoryModel.get_all_devices(db)
-    
-    # Enrich with image regex
+    devices = InventoryModel.get_all_devices(get_db())
+
+    # Enrich with image regex, resolved once per unique model rather than
+    # once per row - inventories repeat a handful of SKUs
+    unique_models = {device.get('model') for device in devices}
+    regex_by_model = {model: get_image_regex_for_model(model) for model in unique_models}
     for device in devices:
-        device['image_regex'] = get_image_regex_for_model(device.get('model'))
-        
-    return jsonify({'devices': devices})
+        device['image_regex'] = regex_by_model.get(device.get('model'))
+
+    return _json_response({'devices': devices})
+
+
+def _purge_logs(logs_path):
+    """Delete all .log files under logs_path, tolerating per-file errors"""
+    try:
+        # Handle relative path
+        if not os.path.isabs(logs_path):
+            logs_path = os.path.join(os.getcwd(), logs_path)
+
+        if os.path.exists(logs_path):
+            # scandir streams entries; no fnmatch compile or intermediate list
+            with os.scandir(logs_path) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith('.log'):
+                        try:
+                            os.unlink(entry.path)
+                        except OSError as e:
+                            log.error('Error deleting log file %s: %s', entry.path, e)
+    except Exception as e:
+        log.error('Error clearing logs: %s', e)
 
 
 @discovery_bp.route('/api/inventory/clear', methods=['DELETE'])
 def clear_inventory():
     """Clear all inventory, jobs, pre-checks, and logs"""
     # 1. Clear Jobs
-    JobsModel.clear_all(db)
+    JobsModel.clear_all(get_db())
     
     # 2. Clear Pre-checks
-    PreChecksModel.clear_all(db)
+    PreChecksModel.clear_all(get_db())
     
     # 3. Clear Inventory
-    success = InventoryModel.clear_all(db)
+    success = InventoryModel.clear_all(get_db())
     
-    # 4. Clear Log Files
-    try:
-        config = get_config()
-        logs_path = config.get('logs', {}).get('path', 'app/logs')
-        # Handle relative path
-        if not os.path.isabs(logs_path):
-            logs_path = os.path.join(os.getcwd(), logs_path)
-            
-        if os.path.exists(logs_path):
-            files = glob.glob(os.path.join(logs_path, '*.log'))
-            for f in files:
-                try:
-                    os.remove(f)
-                except Exception as e:
-                    print(f"Error deleting log file {f}: {e}")
-    except Exception as e:
-        print(f"Error clearing logs: {e}")
+    # 4. Clear Log Files (config comes from the mtime-cached accessor,
+    # so this is a dict lookup rather than a disk re-read)
+    config = get_config()
+    logs_path = config.get('logs', {}).get('path', 'app/logs')
+    _purge_logs(logs_path)
 
     if success:
         return jsonify({'message': 'System cleared successfully (Inventory, Jobs, Logs)'})
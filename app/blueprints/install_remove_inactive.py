@@ -4,16 +4,40 @@ Install Blueprint for handling installation operations
 
 from flask import Blueprint, request, jsonify
 from app.utils.ssh_client import SSHClient
-from app.utils.job_manager import JobManager
-from app.database.models import Database
+from app.extensions import get_job_manager
+from concurrent.futures import ThreadPoolExecutor
 import json
+import os
+import re
 
 install_bp = Blueprint('install', __name__)
 
-# Load config
+# Failure markers in IOS-XE install command output
+_FAILURE_RE = re.compile(r'%\s*Error|Failed|failure|Invalid', re.IGNORECASE)
+
+# Load config, cached against the file mtime (same scheme as discovery)
+# so each request pays a stat() rather than an open + JSON parse
+_CONFIG_CACHE = {'mtime': None, 'data': {}}
+
 def get_config():
-    with open('config.json', 'r') as f:
-        return json.load(f)
+    mtime = os.path.getmtime('config.json')
+    if mtime != _CONFIG_CACHE['mtime']:
+        with open('config.json', 'r') as f:
+            _CONFIG_CACHE['data'] = json.load(f)
+        _CONFIG_CACHE['mtime'] = mtime
+    return _CONFIG_CACHE['data']
+
+# Shared JobManager, matching the other blueprints - previously one was
+# constructed per request and another per background worker
+_initial_config = get_config()
+job_manager = get_job_manager()
+
+# Bounded pool for install workers so a large push can't monopolize the
+# scheduler's threads; each worker holds an SSH session while it runs
+_install_pool = ThreadPoolExecutor(
+    max_workers=_initial_config.get('install', {}).get('max_concurrent', 16),
+    thread_name_prefix='install'
+)
 
 @install_bp.route('/api/install-remove-inactive', methods=['POST'])
 def install_remove_inactive():
@@ -31,11 +55,7 @@ def install_remove_inactive():
     username = config['credentials']['ssh_username']
     password = config['credentials']['ssh_password']
     enable_password = config['credentials'].get('enable_password', '')
-    
-    # Initialize JobManager
-    logs_path = config.get('logs', {}).get('path', 'app/logs')
-    job_manager = JobManager(config['database']['path'], logs_path)
-    
+
     results = []
     
     for ip in ip_list:
@@ -44,13 +64,11 @@ def install_remove_inactive():
         
         if job_id:
             # Start background job
-            from flask import current_app
-            current_app.config['scheduler'].add_job(
-                id=f"install_remove_{job_id}",
-                func=_run_install_remove_inactive_thread,
-                args=(job_id, ip, username, password, enable_password, config['database']['path'], logs_path)
+            _install_pool.submit(
+                _run_install_remove_inactive_thread,
+                job_id, ip, username, password, enable_password
             )
-            
+
             results.append({
                 'ip': ip,
                 'status': 'started',
@@ -68,10 +86,8 @@ def install_remove_inactive():
         'results': results
     })
 
-def _run_install_remove_inactive_thread(job_id, ip, username, password, enable_password, db_path, logs_path):
+def _run_install_remove_inactive_thread(job_id, ip, username, password, enable_password):
     """Background thread for install remove inactive with streaming"""
-    job_manager = JobManager(db_path, logs_path)
-    
     try:
         job_manager.append_log(job_id, f"Connecting to {ip}...")
         ssh = SSHClient(ip, username, password, enable_password)
@@ -100,8 +116,7 @@ def _run_install_remove_inactive_thread(job_id, ip, username, password, enable_p
             output_str = "\n".join(full_output)
             
             # Check for common failure keywords in IOS-XE install commands
-            failure_keywords = ['% Error', 'Failed', 'failure', 'Invalid']
-            has_error = any(keyword.lower() in output_str.lower() for keyword in failure_keywords)
+            has_error = _FAILURE_RE.search(output_str) is not None
             
             if success and not has_error:
                 job_manager.append_log(job_id, "Command completed successfully.")
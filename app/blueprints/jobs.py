@@ -2,28 +2,33 @@
 Jobs blueprint for managing and viewing background jobs
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from app.database.models import JobsModel
-from app.utils.job_manager import JobManager
-from app.utils.event_bus import event_queue, get_events
-from app.extensions import db, get_config
-import json
+from app.utils.event_bus import subscribe, unsubscribe
+from app.extensions import db, get_job_manager
+import orjson
+import queue
 import zoneinfo
 from datetime import datetime
+from functools import lru_cache
 
 jobs_bp = Blueprint('jobs', __name__)
 
-# Load config
-config = get_config()
-logs_path = config.get('logs', {}).get('path', 'app/logs')
-job_manager = JobManager(config['database']['path'], logs_path)
+
+@lru_cache(maxsize=None)
+def _tz(name):
+    """Cache ZoneInfo objects - construction re-reads the tz database"""
+    return zoneinfo.ZoneInfo(name)
 
 
 @jobs_bp.route('/api/jobs', methods=['GET'])
 def get_all_jobs():
     """Get all jobs"""
     jobs = JobsModel.get_all_jobs(db)
-    return jsonify({'jobs': jobs})
+    # Content-hash ETag turns unchanged polls into header-only 304s
+    response = jsonify({'jobs': jobs})
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 @jobs_bp.route('/api/jobs/clear', methods=['DELETE'])
@@ -41,7 +46,7 @@ def get_job(job_id):
     """
     Get job details and log content
     """
-    job = job_manager.get_job_details(job_id)
+    job = get_job_manager().get_job_details(job_id)
     if job:
         return jsonify({
             'success': True,
@@ -85,33 +90,34 @@ def stream_events():
     Server-Sent Events endpoint for real-time logs
     Shared across all job types (copy, verify, upgrade, etc.)
     """
-    import time
-    
     def generate():
-        # Start from the current end of queue to avoid replaying old history
-        last_index = len(event_queue)
-        heartbeat_count = 0
-        max_heartbeats = 600  # ~5 minutes at 0.5s intervals
-        
-        while heartbeat_count < max_heartbeats:
-            # Send new events
-            events = get_events(last_index)
-            if events:
-                heartbeat_count = 0  # Reset on activity
-            for event in events:
-                yield f"data: {json.dumps(event)}\n\n"
-                last_index += 1
-            
-            # Keep connection alive
-            time.sleep(0.5)
-            heartbeat_count += 1
-    
-    
-    return generate(), {
-        'Content-Type': 'text/event-stream',
-        'Cache-Control': 'no-cache',
-        'X-Accel-Buffering': 'no'
-    }
+        # Private queue per connection; only sees events emitted after subscribing
+        events = subscribe()
+        idle_waits = 0
+        max_idle_waits = 20  # ~5 minutes at 15s timeouts
+
+        try:
+            while idle_waits < max_idle_waits:
+                # Block until something is emitted instead of polling
+                try:
+                    event = events.get(timeout=15.0)
+                except queue.Empty:
+                    # Comment line keeps the connection alive through proxies
+                    yield b": keepalive\n\n"
+                    idle_waits += 1
+                    continue
+                idle_waits = 0  # Reset on activity
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        finally:
+            unsubscribe(events)
+
+
+    # direct_passthrough hands each yielded bytes chunk straight to the
+    # server without werkzeug's iteration wrapping
+    response = Response(generate(), mimetype='text/event-stream', direct_passthrough=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @jobs_bp.route('/api/jobs/<job_id>/cancel', methods=['POST'])
@@ -147,7 +153,7 @@ def reschedule_job(job_id):
     try:
         # Parse and localize
         dt = datetime.fromisoformat(schedule_time)
-        tz = zoneinfo.ZoneInfo(timezone)
+        tz = _tz(timezone)
         dt = dt.replace(tzinfo=tz)
         schedule_time = dt.isoformat()
     except (ValueError, KeyError) as e:
@@ -2,13 +2,12 @@
 Reports blueprint for generating downloadable PDF reports
 """
 
-from flask import Blueprint, send_file, request, jsonify, render_template
+from flask import Blueprint, Response, request, jsonify, render_template
 from app.database.models import InventoryModel, PreChecksModel
 from app.extensions import db, get_config
 from fpdf import FPDF
 import json
 import os
-import io
 from datetime import datetime
 
 reports_bp = Blueprint('reports', __name__)
@@ -37,11 +36,13 @@ def get_prechecks_report_data():
     """
     try:
         devices = InventoryModel.get_all_devices(db)
+        # One query for every device's checks instead of one per device
+        checks_by_ip = PreChecksModel.get_checks_for_all_devices(db)
         report_data = []
-        
+
         for device in devices:
             ip = device.get('ip_address')
-            checks = PreChecksModel.get_checks_for_device(db, ip)
+            checks = checks_by_ip.get(ip, [])
             report_data.append({
                 'hostname': device.get('hostname', 'Unknown'),
                 'ip_address': ip,
@@ -57,6 +58,11 @@ def get_prechecks_report_data():
         return jsonify({'error': str(e)}), 500
 
 class PrecheckPDF(FPDF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Format once per document rather than once per page footer
+        self.generated_on = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
     def header(self):
         # Logo placeholder (if any)
         self.set_font('helvetica', 'B', 15)
@@ -66,7 +72,18 @@ class PrecheckPDF(FPDF):
     def footer(self):
         self.set_y(-15)
         self.set_font('helvetica', 'I', 8)
-        self.cell(0, 10, f'Page {self.page_no()} | Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', align='C')
+        self.cell(0, 10, f'Page {self.page_no()} | Generated on {self.generated_on}', align='C')
+
+# Control characters (except tab/LF/CR) stripped from PDF cell text in the
+# same C-level pass that drops non-Latin-1 characters
+_CTRL_DELETE = bytes(c for c in range(32) if c not in (9, 10, 13))
+
+# Result-column text colors; anything unrecognized renders brown like WARN
+_RESULT_COLORS = {
+    'PASS': (0, 128, 0),
+    'FAIL': (255, 0, 0),
+    'ERROR': (255, 0, 0),
+}
 
 def sanitize_text(text):
     """
@@ -74,12 +91,9 @@ def sanitize_text(text):
     """
     if not text:
         return ""
-    # Standard fonts only support a limited set of characters (Latin-1/WinAnsi)
-    # We'll encode/decode with ignore to strip everything else
-    try:
-        return text.encode('latin-1', 'ignore').decode('latin-1')
-    except Exception:
-        return "".join(c for c in text if ord(c) < 256)
+    # Standard fonts only support a limited set of characters (Latin-1/WinAnsi);
+    # encoding with 'ignore' cannot raise, and translate deletes control bytes
+    return text.encode('latin-1', 'ignore').translate(None, _CTRL_DELETE).decode('latin-1')
 
 @reports_bp.route('/api/reports/prechecks/pdf', methods=['GET'])
 def download_prechecks_pdf():
@@ -88,7 +102,8 @@ def download_prechecks_pdf():
     """
     try:
         devices = InventoryModel.get_all_devices(db)
-        
+        checks_by_ip = PreChecksModel.get_checks_for_all_devices(db)
+
         pdf = PrecheckPDF()
         pdf.add_page()
         
@@ -106,7 +121,7 @@ def download_prechecks_pdf():
                 pdf.cell(0, 10, f'Device: {hostname} ({ip})', ln=True, fill=True)
                 
                 # Check results
-                checks = PreChecksModel.get_checks_for_device(db, ip)
+                checks = checks_by_ip.get(device.get('ip_address'), [])
                 
                 # Add Image Verification Row as the first custom check if target image exists
                 target_img = sanitize_text(device.get('target_image', 'N/A'))
@@ -139,19 +154,13 @@ def download_prechecks_pdf():
                         name = sanitize_text(check.get('check_name', ''))
                         result = sanitize_text(check.get('result', ''))
                         message = sanitize_text(check.get('message', '')).replace('\n', ' ')
-                        
+
                         if len(message) > 60:
                             message = message[:57] + "..."
-                            
+
                         pdf.cell(60, 7, name, border=1)
-                        
-                        if result == 'PASS':
-                            pdf.set_text_color(0, 128, 0)
-                        elif result in ['FAIL', 'ERROR']:
-                            pdf.set_text_color(255, 0, 0)
-                        else:
-                            pdf.set_text_color(165, 42, 42)
-                            
+
+                        pdf.set_text_color(*_RESULT_COLORS.get(result, (165, 42, 42)))
                         pdf.cell(30, 7, result, border=1)
                         pdf.set_text_color(0, 0, 0)
                         pdf.cell(100, 7, message, border=1, ln=True)
@@ -162,21 +171,23 @@ def download_prechecks_pdf():
                 if pdf.get_y() > 250:
                     pdf.add_page()
 
-        # Output to buffer (fpdf2 returns bytes by default)
+        # fpdf2 returns the document as bytes
         pdf_output = pdf.output()
         if isinstance(pdf_output, str):
             pdf_output = pdf_output.encode('latin-1')
-        buffer = io.BytesIO(pdf_output)
-        buffer.seek(0)
-        
+
         filename = f"Precheck_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        
-        response = send_file(
-            buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
-        )
+
+        # Stream the bytes in chunks rather than copying them into a
+        # BytesIO for send_file - no second copy, and the first chunk
+        # hits the socket as soon as the generator starts
+        def _stream(data, chunk_size=64 * 1024):
+            view = memoryview(data)
+            for offset in range(0, len(view), chunk_size):
+                yield bytes(view[offset:offset + chunk_size])
+
+        response = Response(_stream(pdf_output), mimetype='application/pdf')
+        response.headers['Content-Length'] = len(pdf_output)
         # Force the header to be extra explicit
         response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
         response.headers['Access-Control-Expose-Headers'] = 'Content-Disposition'
@@ -22,11 +22,10 @@ os.makedirs(REPO_PATH, exist_ok=True)
 
 def calculate_md5(file_path):
     """Calculate MD5 checksum of file"""
-    hash_md5 = hashlib.md5()
+    # file_digest runs the read/update loop in C with a large buffer,
+    # which matters for multi-GB images
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+        return hashlib.file_digest(f, "md5").hexdigest()
 
 
 @repository_bp.route('/api/repository/upload', methods=['POST'])
@@ -52,11 +51,17 @@ def upload_image():
     filename = secure_filename(file.filename)
     file_path = os.path.join(REPO_PATH, filename)
     
-    # Save file
-    file.save(file_path)
-    
-    # Calculate MD5
-    md5_actual = calculate_md5(file_path)
+    # Save file, hashing each chunk as it streams in so the image is
+    # read once instead of being re-read from disk for the checksum
+    hash_md5 = hashlib.md5()
+    with open(file_path, 'wb') as out:
+        while True:
+            chunk = file.stream.read(1024 * 1024)
+            if not chunk:
+                break
+            hash_md5.update(chunk)
+            out.write(chunk)
+    md5_actual = hash_md5.hexdigest()
     
     # Verify MD5 (now required)
     if md5_actual.lower() != md5_expected.lower():
@@ -69,6 +74,11 @@ def upload_image():
     
     # Add to database with MD5 hash
     RepositoryModel.add_image(db, filename, md5_expected, file_path)
+
+    # The repository copy changed, so cached device-side verification
+    # results for this filename no longer mean anything
+    from app.blueprints.verify_image import invalidate_verifications
+    invalidate_verifications(filename)
     
     return jsonify({
         'message': 'File uploaded successfully',
@@ -82,25 +92,29 @@ def upload_image():
 def get_images():
     """Get all images in repository"""
     images = RepositoryModel.get_all_images(db)
-    
-    # Add file size for each image
+
+    # Add file size for each image - one directory scan instead of an
+    # exists() + getsize() stat pair per file
+    try:
+        sizes = {e.name: e.stat().st_size for e in os.scandir(REPO_PATH) if e.is_file()}
+    except OSError:
+        sizes = {}
     for image in images:
-        if os.path.exists(image['file_path']):
-            image['size_bytes'] = os.path.getsize(image['file_path'])
-            image['size_mb'] = round(image['size_bytes'] / (1024**2), 2)
-        else:
-            image['size_bytes'] = 0
-            image['size_mb'] = 0
+        size = sizes.get(os.path.basename(image['file_path']), 0)
+        image['size_bytes'] = size
+        image['size_mb'] = round(size / 1048576, 2)
     
-    return jsonify({'images': images})
+    # Content-hash ETag turns unchanged polls into header-only 304s
+    response = jsonify({'images': images})
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 @repository_bp.route('/api/repository/<filename>', methods=['DELETE'])
 def delete_image(filename):
     """Delete image from repository"""
-    images = RepositoryModel.get_all_images(db)
-    image = next((img for img in images if img['filename'] == filename), None)
-    
+    image = RepositoryModel.get_image_by_filename(db, filename)
+
     if not image:
         return jsonify({'error': 'Image not found'}), 404
     
@@ -120,4 +134,7 @@ def serve_image(filename):
     Serve image file via HTTP for device download
     This endpoint is used by devices to copy images
     """
-    return send_from_directory(REPO_PATH, filename)
+    # conditional=True enables Range/If-Modified-Since handling, and lets
+    # werkzeug hand the open file to wsgi.file_wrapper so a production WSGI
+    # server can serve it via sendfile(2) instead of copying through Python
+    return send_from_directory(REPO_PATH, filename, conditional=True)
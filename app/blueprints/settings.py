@@ -3,9 +3,12 @@ Settings blueprint for credential management
 """
 
 from flask import Blueprint, request, jsonify
+from app.extensions import get_config_cached, invalidate_config_cache
 import json
 import os
 import socket
+import threading
+import time
 
 settings_bp = Blueprint('settings', __name__)
 
@@ -13,6 +16,24 @@ settings_bp = Blueprint('settings', __name__)
 CONFIG_PATH = 'config.json'
 
 
+def _write_config(config):
+    """
+    Write config.json atomically: dump to a temp file and os.replace() it
+    over the original, so a crash mid-write can't leave a truncated config.
+    """
+    tmp_path = CONFIG_PATH + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp_path, CONFIG_PATH)
+    invalidate_config_cache()
+
+# Interface enumeration forks 'ip addr' and opens a UDP socket; the
+# interface list changes on minute timescales, so cache it briefly
+_IP_CACHE_TTL = 30.0
+_ip_cache = {'ts': 0.0, 'val': None}
+_ip_cache_lock = threading.Lock()
+
+
 def _get_all_server_ips() -> list:
     """
     Return all non-loopback IPv4 addresses on this host, in a form suitable
@@ -23,6 +44,10 @@ def _get_all_server_ips() -> list:
     import re
     import platform
 
+    now = time.monotonic()
+    if _ip_cache['val'] is not None and (now - _ip_cache['ts']) < _IP_CACHE_TTL:
+        return _ip_cache['val']
+
     ips = []
     seen = set()
 
@@ -64,6 +89,10 @@ def _get_all_server_ips() -> list:
     if ips:
         ips[0]['label'] = f"{ips[0]['ip']} (primary)"
 
+    with _ip_cache_lock:
+        _ip_cache['ts'] = now
+        _ip_cache['val'] = ips
+
     return ips
 
 
@@ -71,13 +100,12 @@ def _get_all_server_ips() -> list:
 def get_server_ips():
     """Return all detected server IPs and the currently saved http_server_ip."""
     try:
-        with open(CONFIG_PATH, 'r') as f:
-            config = json.load(f)
-        saved_ip = config.get('http_server_ip', '')
+        saved_ip = get_config_cached().get('http_server_ip', '')
     except Exception:
         saved_ip = ''
 
-    detected = _get_all_server_ips()
+    # Copy so appending the saved IP below can't grow the cached list
+    detected = list(_get_all_server_ips())
 
     # If saved IP isn't in detected list, add it so it shows in the dropdown
     if saved_ip and not any(d['ip'] == saved_ip for d in detected):
@@ -92,9 +120,8 @@ def get_credentials():
     Get current credentials (without passwords for security)
     """
     try:
-        with open(CONFIG_PATH, 'r') as f:
-            config = json.load(f)
-        
+        config = get_config_cached()
+
         return jsonify({
             'username': config['credentials']['ssh_username'],
             'netconf_port': config['credentials']['netconf_port'],
@@ -131,10 +158,8 @@ def update_credentials():
         config['credentials']['enable_password'] = enable_password
         config['credentials']['netconf_port'] = netconf_port
         
-        # Write back to file
-        with open(CONFIG_PATH, 'w') as f:
-            json.dump(config, f, indent=2)
-        
+        _write_config(config)
+
         return jsonify({
             'message': 'Credentials updated successfully',
             'username': username,
@@ -151,12 +176,12 @@ def get_settings():
     Get all settings including HTTP server IP
     """
     try:
-        with open(CONFIG_PATH, 'r') as f:
-            config = json.load(f)
-        
-        return jsonify({
-            'http_server_ip': config.get('http_server_ip', '')
+        response = jsonify({
+            'http_server_ip': get_config_cached().get('http_server_ip', '')
         })
+        # ETag from the config mtime so unchanged polls get a 304
+        response.set_etag(hex(os.stat(CONFIG_PATH).st_mtime_ns))
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -177,10 +202,8 @@ def save_settings():
         if 'http_server_ip' in data:
             config['http_server_ip'] = data['http_server_ip']
         
-        # Write back to file
-        with open(CONFIG_PATH, 'w') as f:
-            json.dump(config, f, indent=2)
-        
+        _write_config(config)
+
         return jsonify({'message': 'Settings saved successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -5,23 +5,28 @@ Upgrade blueprint for upgrade orchestration and scheduling
 from flask import Blueprint, request, jsonify
 from app.database.models import JobsModel, InventoryModel, PreChecksModel
 from app.utils.precheck_engine import PreCheckEngine
-from app.utils.ssh_client import SSHClient
+from app.utils.ssh_pool import acquire_ssh
 from app.utils.netconf_client import NetconfClient
 from app.utils.event_bus import emit_job_log
-from app.utils.job_manager import JobManager
-from app.extensions import db, get_config
+from app.extensions import db, get_config, get_job_manager
 import json
 import uuid
 import zoneinfo
 from datetime import datetime
+from functools import lru_cache
 import os
 
 upgrade_bp = Blueprint('upgrade', __name__)
 
+
+@lru_cache(maxsize=64)
+def _tz(name):
+    """Cache ZoneInfo objects - construction re-reads the tz database"""
+    return zoneinfo.ZoneInfo(name)
+
 # Load config
 config = get_config()
-logs_path = config.get('logs', {}).get('path', 'app/logs')
-job_manager = JobManager(config['database']['path'], logs_path)
+job_manager = get_job_manager()
 
 
 @upgrade_bp.route('/api/precheck', methods=['POST'])
@@ -53,9 +58,8 @@ def run_precheck():
     # Run pre-checks
     precheck = PreCheckEngine(ip_address, username, password, netconf_port, enable_password)
     
-    # Determine filesystem based on device role
-    netconf_client = NetconfClient(ip_address, netconf_port, username, password)
-    filesystem = netconf_client.get_filesystem_for_role(device['device_role'])
+    # Determine filesystem based on device role (pure lookup, no session)
+    filesystem = NetconfClient.get_filesystem_for_role(device['device_role'])
     
     # Validated target_image logic
     target_image = device.get('target_image')
@@ -79,15 +83,11 @@ def run_precheck():
                 InventoryModel.set_image_copied(db, ip_address, 'No')
                 InventoryModel.set_image_verified(db, ip_address, 'No')
     
-    # Store results in database
-    for result in results:
-        PreChecksModel.add_check(
-            db,
-            ip_address,
-            result['check_name'],
-            result['result'],
-            result['message']
-        )
+    # Store results in database in one transaction
+    PreChecksModel.add_checks_bulk(
+        db,
+        [(ip_address, r['check_name'], r['result'], r['message']) for r in results]
+    )
     
     # Check if all passed
     all_passed = precheck.all_checks_passed()
@@ -145,10 +145,9 @@ def schedule_upgrade():
             dt = datetime.fromisoformat(schedule_time)
             # Apply timezone if not provided in string
             if dt.tzinfo is None:
-                tz = zoneinfo.ZoneInfo(timezone)
-                dt = dt.replace(tzinfo=tz)
+                dt = dt.replace(tzinfo=_tz(timezone))
             # Convert to UTC for storage
-            dt_utc = dt.astimezone(zoneinfo.ZoneInfo('UTC'))
+            dt_utc = dt.astimezone(_tz('UTC'))
             schedule_time = dt_utc.isoformat()
         except ValueError as e:
             print(f"Error processing timezone {timezone}: {e}")
@@ -228,94 +227,96 @@ def execute_upgrade(job_id: str, ip_address: str, image_filename: str, device_ro
     # Update job status
     JobsModel.update_job_status(db, job_id, 'Running')
     
-    log_output = []
-    
-    # Initialize log file if provided
+    # Open the log file once for the whole job (line-buffered so each
+    # entry is still visible immediately) instead of reopening per line
+    log_fp = None
     if log_file_path:
         try:
             os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
-            with open(log_file_path, 'w') as f:
-                f.write(f"Upgrade Log for Job {job_id}\n")
-                f.write(f"Device: {ip_address}\n")
-                f.write(f"Target: {image_filename}\n")
-                f.write("-" * 50 + "\n")
+            log_fp = open(log_file_path, 'w', buffering=1)
+            log_fp.write(f"Upgrade Log for Job {job_id}\n")
+            log_fp.write(f"Device: {ip_address}\n")
+            log_fp.write(f"Target: {image_filename}\n")
+            log_fp.write("-" * 50 + "\n")
         except OSError as e:
             print(f"Error creating log file: {e}")
+            log_fp = None
 
     def log(message):
         timestamp = datetime.now().strftime('%H:%M:%S')
         log_entry = f"[{timestamp}] {message}"
-        log_output.append(log_entry)
         emit_job_log(job_id, message)
         print(message)
-        
-        # Append to file
-        if log_file_path:
+
+        if log_fp:
             try:
-                with open(log_file_path, 'a') as f:
-                    f.write(log_entry + "\n")
-            except:
+                log_fp.write(log_entry + "\n")
+            except OSError:
                 pass
-    
+
     try:
         log(f"Starting upgrade for {ip_address}")
         
         # Determine filesystem
-        netconf_client = NetconfClient(ip_address, netconf_port, username, password)
-        filesystem = netconf_client.get_filesystem_for_role(device_role)
+        filesystem = NetconfClient.get_filesystem_for_role(device_role)
         
         log(f"Device role: {device_role}, Filesystem: {filesystem}")
         
-        # Connect via SSH
-        ssh = SSHClient(ip_address, username, password, enable_password)
-        if not ssh.connect():
-            log("ERROR: SSH connection failed")
-            JobsModel.update_job_status(db, job_id, 'Failed', datetime.now())
-            return
-        
-        log("SSH connection established")
+        # Connect via SSH (pooled - precheck/copy/verify runs against the
+        # same device reuse one transport instead of re-handshaking)
+        with acquire_ssh(ip_address, username, password, enable_password) as ssh:
+            if ssh is None:
+                log("ERROR: SSH connection failed")
+                JobsModel.update_job_status(db, job_id, 'Failed', datetime.now())
+                return
 
-        # Verify file exists strictly before installing
-        log(f"Verifying {image_filename} exists on {filesystem}...")
-        if not ssh.check_file_exists(filesystem, image_filename):
-             log(f"ERROR: Image file {image_filename} not found on {filesystem}. Please 'Copy Image' first.")
-             JobsModel.update_job_status(db, job_id, 'Failed', datetime.now())
-             ssh.disconnect()
-             return
+            log("SSH connection established")
 
-        log("Image verification successful.")
-        
-        # Save configuration to prevent 'System configuration has been modified' error
-        log("Saving system configuration...")
-        if ssh.save_config():
-            log("Configuration saved successfully.")
-        else:
-            log("Warning: Failed to save configuration. Upgrade might fail if config is modified.")
-            
-        log("Proceeding to Install mode upgrade...")
-        
-        # Execute install command
-        # Command structure: install add file <filesystem>:<filename> activate commit prompt-level none
-        log(f"Executing: install add file {filesystem}{image_filename} activate commit prompt-level none")
-        
-        # Use callback for real-time logging
-        install_result = ssh.execute_install_command(filesystem, image_filename, callback=lambda msg: log(msg.strip()))
-        
-        if install_result.get('success'):
-            if install_result.get('status') == 'RELOADING':
-                log("Device is reloading as expected. Connection dropped.")
-                log("Upgrade initiated successfully.")
+            # Verify file exists strictly before installing
+            log(f"Verifying {image_filename} exists on {filesystem}...")
+            if not ssh.check_file_exists(filesystem, image_filename):
+                log(f"ERROR: Image file {image_filename} not found on {filesystem}. Please 'Copy Image' first.")
+                JobsModel.update_job_status(db, job_id, 'Failed', datetime.now())
+                return
+
+            log("Image verification successful.")
+
+            # Save configuration to prevent 'System configuration has been modified' error
+            log("Saving system configuration...")
+            if ssh.save_config():
+                log("Configuration saved successfully.")
             else:
-                log("Install command completed successfully")
-            
-            JobsModel.update_job_status(db, job_id, 'Success', datetime.now())
-        else:
-            log(f"ERROR: Install command failed - {install_result.get('error', 'Unknown error')}")
-            JobsModel.update_job_status(db, job_id, 'Failed', datetime.now())
-        
-        ssh.disconnect()
+                log("Warning: Failed to save configuration. Upgrade might fail if config is modified.")
+
+            log("Proceeding to Install mode upgrade...")
+
+            # Execute install command
+            # Command structure: install add file <filesystem>:<filename> activate commit prompt-level none
+            log(f"Executing: install add file {filesystem}{image_filename} activate commit prompt-level none")
+
+            # Use callback for real-time logging
+            install_result = ssh.execute_install_command(filesystem, image_filename, callback=lambda msg: log(msg.strip()))
+
+            if install_result.get('success'):
+                if install_result.get('status') == 'RELOADING':
+                    log("Device is reloading as expected. Connection dropped.")
+                    log("Upgrade initiated successfully.")
+                else:
+                    log("Install command completed successfully")
+
+                JobsModel.update_job_status(db, job_id, 'Success', datetime.now())
+            else:
+                log(f"ERROR: Install command failed - {install_result.get('error', 'Unknown error')}")
+                JobsModel.update_job_status(db, job_id, 'Failed', datetime.now())
+
         log("Upgrade process completed")
         
     except Exception as e:
         log(f"EXCEPTION: {str(e)}")
         JobsModel.update_job_status(db, job_id, 'Failed', datetime.now())
+    finally:
+        if log_fp:
+            try:
+                log_fp.close()
+            except OSError:
+                pass
@@ -5,11 +5,10 @@ Spawns individual jobs per device for MD5 checksum validation.
 
 from flask import Blueprint, request, jsonify
 from app.database.models import InventoryModel, JobsModel, RepositoryModel
-from app.utils.ssh_client import SSHClient
-from app.utils.job_manager import JobManager
+from app.utils.ssh_pool import acquire_ssh
 from app.utils.netconf_client import NetconfClient
-from app.extensions import db, get_config
-import json
+from app.extensions import db, get_config, get_config_cached, get_job_manager
+import time
 import uuid
 from datetime import datetime
 
@@ -17,7 +16,25 @@ verify_image_bp = Blueprint('verify_image', __name__)
 
 # Load config
 config = get_config()
-job_manager = JobManager(config['database']['path'], config['logs']['path'])
+job_manager = get_job_manager()
+
+# Successful verifications, keyed (ip, image) -> monotonic timestamp, so
+# re-posting the same IP list doesn't redo the switch-side MD5 every time
+_recent_verifications = {}
+_VERIFY_DEDUP_TTL = 600.0
+
+
+def invalidate_verifications(image_filename, ip_address=None):
+    """
+    Drop cached verification results for an image - for one device (the
+    copy job is about to overwrite it on flash) or for all devices (the
+    repository copy itself was re-uploaded)
+    """
+    if ip_address is not None:
+        _recent_verifications.pop((ip_address, image_filename), None)
+        return
+    for key in [k for k in _recent_verifications if k[1] == image_filename]:
+        _recent_verifications.pop(key, None)
 
 
 @verify_image_bp.route('/api/operations/verify', methods=['POST'])
@@ -36,14 +53,18 @@ def start_verify_job():
 
     job_ids = []
 
+    # One IN-query for every device's target image instead of a
+    # per-IP lookup inside the loop
+    devices_by_ip = {} if global_target_image else InventoryModel.get_devices_in(db, ip_list)
+
     for ip in ip_list:
         # Determine target image for this specific device
         target_image = global_target_image
         if not target_image:
-            device = InventoryModel.get_device(db, ip)
+            device = devices_by_ip.get(ip)
             if device:
                 target_image = device.get('target_image')
-        
+
         if not target_image:
             # Skip this device if no image selected
             continue
@@ -81,92 +102,116 @@ def start_verify_job():
     })
 
 
-def execute_verify_job(job_id, ip_address, image_filename):
+def execute_verify_job(job_id, ip_address, image_filename, ssh=None):
     """
-    Execute verify job for a single device
+    Execute verify job for a single device.
+    An already-connected SSHClient can be passed in (e.g. when chained from a
+    copy job holding a pooled session); otherwise a session is acquired from
+    the shared SSH pool and released back to it when done.
     """
     job_manager.update_job_status(job_id, "Running")
     job_manager.append_log(job_id, f"Stack: Starting image verification for {ip_address}")
-    
-    result = False
+
     try:
-        # Reload config
-        with open('config.json', 'r') as f:
-            local_config = json.load(f)
-            
+        if ssh is not None:
+            # Chained from a copy job that just rewrote the file on flash -
+            # never dedup here, always hash the freshly written image
+            job_manager.append_log(job_id, "Reusing existing SSH session...")
+            _verify_with_session(job_id, ip_address, image_filename, ssh)
+            return
+
+        # Standalone re-run: skip the SSH round-trip entirely if this exact
+        # (device, image) pair verified successfully in the last few minutes
+        verified_at = _recent_verifications.get((ip_address, image_filename))
+        if verified_at and (time.monotonic() - verified_at) < _VERIFY_DEDUP_TTL:
+            job_manager.append_log(
+                job_id,
+                f"{image_filename} on {ip_address} verified successfully "
+                f"{int(time.monotonic() - verified_at)}s ago - skipping re-check."
+            )
+            InventoryModel.set_image_verified(db, ip_address, 'Yes')
+            job_manager.update_job_status(job_id, 'COMPLETED')
+            return
+
+        # Reload config through the shared mtime/TTL cache instead of
+        # re-parsing config.json for every parallel verify job
+        local_config = get_config_cached()
+
         username = local_config['credentials']['ssh_username']
         password = local_config['credentials']['ssh_password']
         enable_password = local_config['credentials'].get('enable_password', '')
 
-        # Connect
         job_manager.append_log(job_id, "Connecting via SSH...")
-        ssh = SSHClient(ip_address, username, password, enable_password)
-        
-        if not ssh.connect():
-            job_manager.append_log(job_id, "ERROR: SSH connection failed")
-            job_manager.update_job_status(job_id, "Failed")
-            return
+        with acquire_ssh(ip_address, username, password, enable_password) as pooled_ssh:
+            if pooled_ssh is None:
+                job_manager.append_log(job_id, "ERROR: SSH connection failed")
+                job_manager.update_job_status(job_id, "Failed")
+                return
 
-        # Verification Logic
-        # Determine filesystem based on device role
-        device_info = InventoryModel.get_device(db, ip_address)
-        device_role = device_info.get('device_role', 'Access') if device_info else 'Access'
-        netconf_client = NetconfClient(ip_address, 830, username, password)
-        destination_fs = netconf_client.get_filesystem_for_role(device_role)
-        
-        job_manager.append_log(job_id, f"Verifying {image_filename} on {destination_fs}...")
-        
-        # Check if file exists first
-        if not ssh.check_file_exists(destination_fs, image_filename):
-            job_manager.append_log(job_id, f"❌ ERROR: File {image_filename} not found on {destination_fs}")
-            InventoryModel.set_image_copied(db, ip_address, 'No')
-            InventoryModel.set_image_verified(db, ip_address, 'Failed')
-            job_manager.update_job_status(job_id, "Failed")
-            ssh.disconnect()
-            return
+            _verify_with_session(job_id, ip_address, image_filename, pooled_ssh)
 
-        # Get Expected Hash
-        expected_hash = RepositoryModel.get_image_hash(db, image_filename)
-        if not expected_hash:
-            job_manager.append_log(job_id, "⚠️ WARNING: No hash found in repository for this image. Cannot verify integrity.")
-            InventoryModel.set_image_verified(db, ip_address, 'No hash')
-            job_manager.update_job_status(job_id, "Success") # Technically success as we did check presence
-            ssh.disconnect()
-            return
-            
-        job_manager.append_log(job_id, f"Expected MD5: {expected_hash}")
-        job_manager.append_log(job_id, "Calculating remote MD5 hash (this may take a minute)...")
-        
-        # Define callback for real-time logging
-        def log_callback(message):
-            job_manager.append_log(job_id, message)
-
-        actual_hash = ssh.calculate_md5(destination_fs, image_filename, callback=log_callback)
-        
-        if actual_hash:
-            job_manager.append_log(job_id, f"Actual MD5:   {actual_hash}")
-            
-            if actual_hash.lower() == expected_hash.lower():
-                job_manager.append_log(job_id, "✅ Verification Successful! Hashes match.")
-                InventoryModel.set_image_verified(db, ip_address, 'Yes')
-                InventoryModel.set_image_copied(db, ip_address, 'Yes') # Confirm copy status too
-                result = True
-            else:
-                job_manager.append_log(job_id, "❌ Verification Failed: Hash mismatch")
-                InventoryModel.set_image_verified(db, ip_address, 'Failed')
-        else:
-            job_manager.append_log(job_id, "❌ Verification Failed: Could not calculate hash")
-            InventoryModel.set_image_verified(db, ip_address, 'Failed')
+    except Exception as e:
+        job_manager.append_log(job_id, f"CRITICAL ERROR: {str(e)}")
+        job_manager.update_job_status(job_id, "Failed")
 
-        if result:
-            job_manager.append_log(job_id, f"✅ Verification successful! MD5 matches.")
-            InventoryModel.set_image_verified(db, ip_address, 'Yes')
-            job_manager.update_job_status(job_id, 'COMPLETED')
-        else:
-            job_manager.update_job_status(job_id, "Failed")
 
-        ssh.disconnect()
+def _verify_with_session(job_id, ip_address, image_filename, ssh):
+    """Run the verification logic over an established SSH session"""
+    result = False
 
-    except Exception as e:
-        job_manager.append_log(job_id, f"CRITICAL ERROR: {str(e)}")
+    # Verification Logic
+    # Determine filesystem based on device role
+    device_info = InventoryModel.get_device(db, ip_address)
+    device_role = device_info.get('device_role', 'Access') if device_info else 'Access'
+    destination_fs = NetconfClient.get_filesystem_for_role(device_role)
+
+    job_manager.append_log(job_id, f"Verifying {image_filename} on {destination_fs}...")
+
+    # Check if file exists first
+    if not ssh.check_file_exists(destination_fs, image_filename):
+        job_manager.append_log(job_id, f"❌ ERROR: File {image_filename} not found on {destination_fs}")
+        InventoryModel.set_image_copied(db, ip_address, 'No')
+        InventoryModel.set_image_verified(db, ip_address, 'Failed')
+        job_manager.update_job_status(job_id, "Failed")
+        return
+
+    # Get Expected Hash
+    expected_hash = RepositoryModel.get_image_hash(db, image_filename)
+    if not expected_hash:
+        job_manager.append_log(job_id, "⚠️ WARNING: No hash found in repository for this image. Cannot verify integrity.")
+        InventoryModel.set_image_verified(db, ip_address, 'No hash')
+        job_manager.update_job_status(job_id, "Success") # Technically success as we did check presence
+        return
+
+    job_manager.append_log(job_id, f"Expected MD5: {expected_hash}")
+    job_manager.append_log(job_id, "Calculating remote MD5 hash (this may take a minute)...")
+
+    # Define callback for real-time logging
+    def log_callback(message):
+        job_manager.append_log(job_id, message)
+
+    actual_hash = ssh.calculate_md5(destination_fs, image_filename, callback=log_callback)
+
+    if actual_hash:
+        job_manager.append_log(job_id, f"Actual MD5:   {actual_hash}")
+
+        if actual_hash.lower() == expected_hash.lower():
+            job_manager.append_log(job_id, "✅ Verification Successful! Hashes match.")
+            InventoryModel.set_image_verified(db, ip_address, 'Yes')
+            InventoryModel.set_image_copied(db, ip_address, 'Yes') # Confirm copy status too
+            result = True
+        else:
+            job_manager.append_log(job_id, "❌ Verification Failed: Hash mismatch")
+            InventoryModel.set_image_verified(db, ip_address, 'Failed')
+    else:
+        job_manager.append_log(job_id, "❌ Verification Failed: Could not calculate hash")
+        InventoryModel.set_image_verified(db, ip_address, 'Failed')
+
+    if result:
+        job_manager.append_log(job_id, f"✅ Verification successful! MD5 matches.")
+        InventoryModel.set_image_verified(db, ip_address, 'Yes')
+        _recent_verifications[(ip_address, image_filename)] = time.monotonic()
+        job_manager.update_job_status(job_id, 'COMPLETED')
+    else:
+        _recent_verifications.pop((ip_address, image_filename), None)
         job_manager.update_job_status(job_id, "Failed")
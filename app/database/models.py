@@ -3,22 +3,61 @@ Database models for IOS-XE Upgrade Manager
 SQLite schema definitions for Inventory, Repository, Jobs, and PreChecks
 """
 
+import queue
 import sqlite3
+import time
+from collections import defaultdict
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
 
+class _PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection that returns itself to its pool on close()"""
+
+    _pool: Optional["queue.Queue"] = None
+
+    def close(self):
+        if self._pool is not None:
+            try:
+                # Discard any half-finished transaction before reuse
+                if self.in_transaction:
+                    self.rollback()
+                self._pool.put_nowait(self)
+                return
+            except (sqlite3.ProgrammingError, queue.Full):
+                pass  # Connection unusable or pool full - really close it
+        super().close()
+
+
 class Database:
-    """SQLite database manager"""
-    
-    def __init__(self, db_path: str):
+    """SQLite database manager with a small connection pool"""
+
+    # Keeps a handful of connections warm instead of paying
+    # sqlite3.connect() open/close cost on every model call
+    POOL_SIZE = 8
+
+    def __init__(self, db_path: str, pool_size: int = POOL_SIZE):
         self.db_path = db_path
+        self._pool: queue.Queue = queue.Queue(maxsize=pool_size)
         self.init_db()
-    
+
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
+        """Get database connection (pooled; close() returns it to the pool)"""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._open_connection()
+
+    def _open_connection(self):
+        # cached_statements keeps repeated model queries prepared per
+        # connection; pooling means those caches survive between calls
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               factory=_PooledConnection, cached_statements=256)
         conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn._pool = self._pool
         return conn
     
     def _add_column_if_not_exists(self, cursor, table: str, column: str, column_type: str):
@@ -96,7 +135,12 @@ class Database:
         self._add_column_if_not_exists(cursor, 'jobs', 'scheduled_time', 'TEXT')
         self._add_column_if_not_exists(cursor, 'jobs', 'timezone', 'TEXT')
         self._add_column_if_not_exists(cursor, 'jobs', 'cancelled', 'INTEGER DEFAULT 0')
-        
+
+        # Indexes backing the active-jobs and per-device job queries,
+        # which otherwise scan the whole jobs table on every poll
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_ip_time ON jobs(target_ip, start_time DESC)')
+
         # Add image_file column to inventory if it doesn't exist
         self._add_column_if_not_exists(cursor, 'inventory', 'image_file', 'TEXT')
         
@@ -156,6 +200,35 @@ class InventoryModel:
         finally:
             conn.close()
     
+    @staticmethod
+    def add_devices_bulk(db: Database, device_rows: List[Dict[str, Any]]) -> bool:
+        """Add or update many devices in a single transaction"""
+        if not device_rows:
+            return True
+        conn = db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO inventory (
+                    ip_address, hostname, serial_number, device_role,
+                    current_version, rommon_version, status, netconf_state,
+                    model, boot_variable, free_space_mb, precheck_status, precheck_details, image_file,
+                    target_image, image_copied, image_verified, is_supported, config_register
+                ) VALUES (
+                    :ip_address, :hostname, :serial_number, :device_role,
+                    :current_version, :rommon_version, :status, :netconf_state,
+                    :model, :boot_variable, :free_space_mb, :precheck_status, :precheck_details, :image_file,
+                    :target_image, :image_copied, :image_verified, :is_supported, :config_register
+                )
+            ''', device_rows)
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error adding devices in bulk: {e}")
+            return False
+        finally:
+            conn.close()
+
     @staticmethod
     def get_all_devices(db: Database) -> List[Dict[str, Any]]:
         """Get all devices from inventory"""
@@ -175,8 +248,28 @@ class InventoryModel:
         row = cursor.fetchone()
         conn.close()
         return dict(row) if row else None
-    
-    
+
+    @staticmethod
+    def get_devices_in(db: Database, ip_list: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get multiple devices by IP in one query. Returns dict keyed by IP."""
+        if not ip_list:
+            return {}
+        conn = db.get_connection()
+        try:
+            cursor = conn.cursor()
+            placeholders = ','.join('?' * len(ip_list))
+            cursor.execute(
+                f'SELECT * FROM inventory WHERE ip_address IN ({placeholders})',
+                list(ip_list)
+            )
+            rows = cursor.fetchall()
+            return {row['ip_address']: dict(row) for row in rows}
+        except sqlite3.Error as e:
+            print(f"Error getting devices: {e}")
+            return {}
+        finally:
+            conn.close()
+
     @staticmethod
     def update_netconf_state(db: Database, ip_address: str, state: str) -> bool:
         """Update NETCONF state for device"""
@@ -236,6 +329,35 @@ class InventoryModel:
         finally:
             conn.close()
 
+    @staticmethod
+    def update_precheck_results(db: Database, ip_address: str,
+                                precheck_status: Optional[str], precheck_details: Optional[str],
+                                image_copied: Optional[str] = None,
+                                image_verified: Optional[str] = None) -> bool:
+        """
+        Update precheck outcome (and optionally the image flags) for a device
+        without rewriting the whole inventory row. Image flags left as None
+        keep their current value.
+        """
+        conn = db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE inventory
+                SET precheck_status = ?, precheck_details = ?,
+                    image_copied = COALESCE(?, image_copied),
+                    image_verified = COALESCE(?, image_verified),
+                    last_updated = CURRENT_TIMESTAMP
+                WHERE ip_address = ?
+            ''', (precheck_status, precheck_details, image_copied, image_verified, ip_address))
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error updating precheck results: {e}")
+            return False
+        finally:
+            conn.close()
+
     @staticmethod
     def set_image_copied(db: Database, ip_address: str, status: str = 'Yes') -> bool:
         """Set image copied status"""
@@ -292,7 +414,13 @@ class InventoryModel:
 
 class RepositoryModel:
     """Repository table operations"""
-    
+
+    # Expected-hash cache: fleet verify runs issue the same lookup once per
+    # device, so keep {filename: (md5, cached_at)} for a few minutes.
+    # Entries are dropped when the image is re-added or deleted.
+    _hash_cache: Dict[str, tuple] = {}
+    _HASH_CACHE_TTL = 300.0
+
     @staticmethod
     def add_image(db: Database, filename: str, md5: str, file_path: str) -> bool:
         """Add image to repository"""
@@ -304,6 +432,7 @@ class RepositoryModel:
                 VALUES (?, ?, ?)
             ''', (filename, md5, file_path))
             conn.commit()
+            RepositoryModel._hash_cache.pop(filename, None)
             return True
         except sqlite3.Error as e:
             print(f"Error adding image: {e}")
@@ -326,15 +455,34 @@ class RepositoryModel:
         finally:
             conn.close()
     
+    @staticmethod
+    def get_image_by_filename(db: Database, filename: str) -> Optional[Dict[str, Any]]:
+        """Get a single image row by filename (primary-key lookup)"""
+        conn = db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM repository WHERE filename = ?', (filename,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"Error getting image: {e}")
+            return None
+        finally:
+            conn.close()
+
     @staticmethod
     def get_image_hash(db: Database, filename: str) -> Optional[str]:
-        """Get expected MD5 hash for image"""
+        """Get expected MD5 hash for image (cached across verify jobs)"""
+        cached = RepositoryModel._hash_cache.get(filename)
+        if cached and (time.monotonic() - cached[1]) < RepositoryModel._HASH_CACHE_TTL:
+            return cached[0]
         conn = db.get_connection()
         try:
             cursor = conn.cursor()
             cursor.execute('SELECT md5_expected FROM repository WHERE filename = ?', (filename,))
             row = cursor.fetchone()
             if row:
+                RepositoryModel._hash_cache[filename] = (row['md5_expected'], time.monotonic())
                 return row['md5_expected']
             return None
         except sqlite3.Error as e:
@@ -351,6 +499,7 @@ class RepositoryModel:
         try:
             cursor.execute('DELETE FROM repository WHERE filename = ?', (filename,))
             conn.commit()
+            RepositoryModel._hash_cache.pop(filename, None)
             return True
         except sqlite3.Error as e:
             print(f"Error deleting image: {e}")
@@ -583,6 +732,29 @@ class PreChecksModel:
         finally:
             conn.close()
     
+    @staticmethod
+    def add_checks_bulk(db: Database, rows: List[tuple]) -> bool:
+        """
+        Add multiple pre-check results in one transaction.
+        rows: list of (ip_address, check_name, result, message) tuples
+        """
+        if not rows:
+            return True
+        conn = db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO prechecks (ip_address, check_name, result, message)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error adding pre-checks in bulk: {e}")
+            return False
+        finally:
+            conn.close()
+
     @staticmethod
     def get_checks_for_device(db: Database, ip_address: str) -> List[Dict[str, Any]]:
         """Get all pre-checks for a device"""
@@ -600,6 +772,24 @@ class PreChecksModel:
             return []
         finally:
             conn.close()
+
+    @staticmethod
+    def get_checks_for_all_devices(db: Database) -> Dict[str, List[Dict[str, Any]]]:
+        """Get all pre-checks bucketed by device IP (one query for reports)"""
+        conn = db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM prechecks ORDER BY checked_at DESC')
+            checks_by_ip: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for row in cursor.fetchall():
+                check = dict(row)
+                checks_by_ip[check['ip_address']].append(check)
+            return checks_by_ip
+        except sqlite3.Error as e:
+            print(f"Error getting checks: {e}")
+            return {}
+        finally:
+            conn.close()
     
     @staticmethod
     def clear_all(db: Database) -> bool:
@@ -5,7 +5,34 @@ to avoid duplicate initialization across blueprints.
 """
 
 import json
+import os
+import threading
+import time
+import orjson
+from flask.json.provider import DefaultJSONProvider
 from app.database.models import Database
+from app.utils.job_manager import JobManager
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson so every jsonify() call serializes in C.
+    Compact output (no pretty-printing) also trims response bytes.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Hand the bytes straight to the Response, skipping the str round-trip
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+            mimetype='application/json'
+        )
 
 
 def get_config():
@@ -14,6 +41,64 @@ def get_config():
         return json.load(f)
 
 
+# Short-TTL config cache for hot paths (e.g. per-device copy jobs) that would
+# otherwise re-read and re-parse config.json on every invocation
+_config_cache_lock = threading.Lock()
+_config_cache = None
+_config_cache_mtime = None
+_config_cache_time = 0.0
+
+
+def get_config_cached(ttl: float = 5.0):
+    """
+    Return the parsed config, re-reading from disk only when config.json's
+    mtime changed or the TTL has expired. Thread-safe.
+    """
+    global _config_cache, _config_cache_mtime, _config_cache_time
+
+    now = time.monotonic()
+    with _config_cache_lock:
+        if _config_cache is not None and (now - _config_cache_time) < ttl:
+            return _config_cache
+
+        try:
+            mtime = os.path.getmtime('config.json')
+        except OSError:
+            mtime = None
+
+        if _config_cache is None or mtime != _config_cache_mtime:
+            _config_cache = get_config()
+            _config_cache_mtime = mtime
+
+        _config_cache_time = now
+        return _config_cache
+
+
+def invalidate_config_cache():
+    """Force the next get_config_cached() to re-read config.json (call after writes)"""
+    global _config_cache_time
+    with _config_cache_lock:
+        _config_cache_time = 0.0
+
+
 # Single shared Database instance
 _config = get_config()
 db = Database(_config['database']['path'])
+
+# Single shared JobManager instance, created on first use. Every blueprint
+# previously built its own against the same database and logs path.
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                cfg = get_config_cached()
+                _job_manager = JobManager(
+                    cfg['database']['path'],
+                    cfg.get('logs', {}).get('path', 'app/logs')
+                )
+    return _job_manager
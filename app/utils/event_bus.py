@@ -3,17 +3,38 @@ Shared Event Bus for Server-Sent Events (SSE)
 Allows different parts of the application to broadcast messages to the frontend.
 """
 
-import json
-from typing import Dict, List, Any
-from collections import deque
+import queue
+import threading
+from typing import Dict, Any
 
-# Global event queue (capped to prevent unbounded memory growth)
-# Stores dictionaries: {'job_id': str, 'message': str, 'timestamp': str}
-event_queue: deque = deque(maxlen=10000)
+# One bounded queue per connected SSE stream; emit fans out to all of them
+# so delivery is O(subscribers) per event with no shared-history copying
+_subscribers: set = set()
+_subscribers_lock = threading.Lock()
+
+# Per-subscriber backlog cap; a stalled client drops events rather than
+# growing memory without bound
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+def subscribe() -> "queue.Queue[Dict[str, Any]]":
+    """
+    Register a new SSE stream. Returns its private event queue.
+    """
+    q: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    with _subscribers_lock:
+        _subscribers.add(q)
+    return q
+
+def unsubscribe(q: "queue.Queue[Dict[str, Any]]"):
+    """
+    Remove a stream's queue when the connection closes.
+    """
+    with _subscribers_lock:
+        _subscribers.discard(q)
 
 def emit_job_log(job_id: str, message: str):
     """
-    Add a job log message to the event queue.
+    Broadcast a job log message to all connected streams.
     """
     event = {
         'type': 'job_log',
@@ -21,12 +42,10 @@ def emit_job_log(job_id: str, message: str):
         'message': message,
         'timestamp': None # Timestamp added by frontend or helper if needed
     }
-    event_queue.append(event)
-
-def get_events(start_index: int = 0) -> List[Dict[str, Any]]:
-    """
-    Get events starting from a specific index.
-    """
-    if start_index >= len(event_queue):
-        return []
-    return list(event_queue)[start_index:]
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    for q in subscribers:
+        try:
+            q.put_nowait(event)
+        except queue.Full:
+            pass  # Slow consumer; skip rather than block the emitter
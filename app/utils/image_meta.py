@@ -0,0 +1,36 @@
+"""
+Image filename helpers for IOS-XE Upgrade Manager
+Extracts version metadata from image filenames
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=256)
+def extract_version(filename: str) -> Optional[str]:
+    """
+    Extract the IOS-XE release (e.g. '17.09.04a') from an image filename
+    like 'cat9k_iosxe.17.09.04a.SPA.bin'.
+
+    Pure string scan over the dot-separated tokens - no regex. The version is
+    the first run of two numeric tokens followed by a token that starts with
+    a digit (the patch, optionally carrying a rebuild letter such as '04a').
+    Bulk runs share a handful of images, so results are memoized.
+    Returns None when no version is found.
+    """
+    if not filename:
+        return None
+
+    tokens = filename.split('.')
+    for i in range(len(tokens) - 2):
+        major, minor, patch = tokens[i], tokens[i + 1], tokens[i + 2]
+        if not (major.isdigit() and minor.isdigit()):
+            continue
+        # Patch must start with a digit; this rejects trailing tokens like
+        # 'SPA' or 'bin' while keeping rebuild suffixes ('04a') attached
+        if not patch or not patch[0].isdigit() or not patch.isalnum():
+            continue
+        return f"{major}.{minor}.{patch}"
+
+    return None
@@ -0,0 +1,19 @@
+"""
+Per-device locks for IOS-XE Upgrade Manager
+Serializes jobs against a single device (prechecks, copy, rediscovery) so
+parallel bulk operations never open concurrent sessions to the same switch,
+which can trigger AAA lockouts or exec-timeout storms. Different devices
+still run fully in parallel.
+"""
+
+import threading
+from collections import defaultdict
+
+_registry_lock = threading.Lock()
+_device_locks = defaultdict(threading.Lock)
+
+
+def device_lock(ip: str) -> threading.Lock:
+    """Return the lock serializing operations against a single device"""
+    with _registry_lock:
+        return _device_locks[ip]
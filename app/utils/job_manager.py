@@ -6,20 +6,30 @@ import uuid
 import os
 import json
 import logging
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from app.database.models import Database, JobsModel
 
 class JobManager:
     """Manages job lifecycle and logging"""
-    
+
+    # Statuses after which a job's log handle can be flushed and dropped
+    TERMINAL_STATUSES = {'completed', 'failed', 'success', 'cancelled', 'missed'}
+
     def __init__(self, db_path: str, logs_path: str):
         self.db = Database(db_path)
         self.logs_path = logs_path
-        
+
         # Ensure logs directory exists
         os.makedirs(self.logs_path, exist_ok=True)
 
+        # Cached append handles per job. Streaming operations log hundreds of
+        # lines; keeping the handle open avoids a DB lookup plus an
+        # open/write/close cycle for every line.
+        self._log_handles: Dict[str, Any] = {}
+        self._log_lock = threading.Lock()
+
     def create_job_logger(self, job_id: str) -> str:
         """
         Create a log file for a specific job and return its path.
@@ -69,33 +79,69 @@ class JobManager:
     def update_job_status(self, job_id: str, status: str) -> bool:
         """Update job status"""
         end_time = datetime.now() if status in ['COMPLETED', 'FAILED'] else None
-        return JobsModel.update_job_status(self.db, job_id, status, end_time)
-        
+        result = JobsModel.update_job_status(self.db, job_id, status, end_time)
+        if status.lower() in self.TERMINAL_STATUSES:
+            self.flush_log(job_id)
+        return result
+
+    def _get_log_handle(self, job_id: str):
+        """Get (or lazily open) the cached append handle for a job's log"""
+        with self._log_lock:
+            handle = self._log_handles.get(job_id)
+            if handle is None or handle.closed:
+                job = JobsModel.get_job(self.db, job_id)
+                if not job or not job.get('log_file_path'):
+                    return None
+                try:
+                    handle = open(job['log_file_path'], 'a')
+                except OSError as e:
+                    print(f"Error opening log for job {job_id}: {e}")
+                    return None
+                self._log_handles[job_id] = handle
+            return handle
+
+    def flush_log(self, job_id: str):
+        """Flush and drop the cached log handle for a job (terminal states)"""
+        with self._log_lock:
+            handle = self._log_handles.pop(job_id, None)
+        if handle and not handle.closed:
+            try:
+                handle.close()
+            except OSError:
+                pass
+
     def append_log(self, job_id: str, message: str):
-        """Append message to job log file"""
-        # We need to look up the log path first
-        job = JobsModel.get_job(self.db, job_id)
-        if not job or not job.get('log_file_path'):
+        """Append message to job log file (buffered via a cached handle)"""
+        handle = self._get_log_handle(job_id)
+        if handle is None:
             return
-            
+
         try:
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(job['log_file_path'], 'a') as f:
-                f.write(f"[{timestamp}] {message}\n")
-            
+            handle.write(f"[{timestamp}] {message}\n")
+
             # Broadcast to UI
             from app.utils.event_bus import emit_job_log
             emit_job_log(job_id, message)
-            
+
         except Exception as e:
             print(f"Error writing to log for job {job_id}: {e}")
-            
+
     def get_job_details(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get job status and log content"""
         job = JobsModel.get_job(self.db, job_id)
         if not job:
             return None
             
+        # Flush any buffered writes so readers see the latest lines
+        with self._log_lock:
+            handle = self._log_handles.get(job_id)
+        if handle and not handle.closed:
+            try:
+                handle.flush()
+            except OSError:
+                pass
+
         # Read log content
         log_content = ""
         if job.get('log_file_path') and os.path.exists(job['log_file_path']):
@@ -349,9 +349,12 @@ class NetconfClient:
         
         return 'Unknown'
     
-    def get_filesystem_for_role(self, device_role: str) -> str:
+    @staticmethod
+    def get_filesystem_for_role(device_role: str) -> str:
         """
-        Get appropriate filesystem based on device role
+        Get appropriate filesystem based on device role.
+        Pure lookup - no device session needed, so callers can use it
+        without constructing (or connecting) a client.
         """
         if device_role == 'Switch':
             return 'flash:'
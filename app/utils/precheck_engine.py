@@ -5,7 +5,7 @@ Implements all required pre-flight checks before upgrade
 
 from typing import Dict, Any, List
 from app.utils.netconf_client import NetconfClient
-from app.utils.ssh_client import SSHClient
+from app.utils.ssh_pool import acquire_ssh
 
 
 class PreCheckEngine:
@@ -25,58 +25,75 @@ class PreCheckEngine:
         Run all pre-checks and return results
         """
         self.results = []
-        
-        # Check 1: Version Comparison
-        self._check_version_difference(current_version, target_version)
-        
-        # Check 2: Boot Variable Integrity
-        self._check_boot_variables(device_role)
-        
-        # Check 3: Disk Space Thresholds
-        self._check_disk_space(device_role, filesystem, target_image_size_mb)
-        
-        # Check 4: ROMMON Flag Validation
-        self._check_rommon_flags()
 
-        # Check 5: NPE Image Detection
-        if target_image_filename:
-            self._check_npe_image(target_image_filename)
+        # Establish a single NETCONF session for the whole run; the boot
+        # variable and disk space checks previously each opened and tore
+        # down their own, paying the session handshake twice per device
+        netconf = None
+        try:
+            candidate = NetconfClient(self.ip_address, self.netconf_port, self.username, self.password)
+            if candidate.connect():
+                netconf = candidate
+        except Exception as e:
+            print(f"NETCONF session setup failed: {e}")
 
-        # Check 6: Image Presence Verification
-        if target_image_filename:
-            self._check_image_presence(filesystem, target_image_filename)
+        try:
+            # Check 1: Version Comparison
+            self._check_version_difference(current_version, target_version)
+
+            # Check 2: Boot Variable Integrity
+            self._check_boot_variables(device_role, netconf)
+
+            # Check 3: Disk Space Thresholds
+            self._check_disk_space(device_role, filesystem, target_image_size_mb, netconf)
+
+            # Check 4: ROMMON Flag Validation
+            self._check_rommon_flags()
+
+            # Check 5: NPE Image Detection
+            if target_image_filename:
+                self._check_npe_image(target_image_filename)
+
+            # Check 6: Image Presence Verification
+            if target_image_filename:
+                self._check_image_presence(filesystem, target_image_filename)
+
+            # Check 7: Commit Status Check
+            self._check_commit_status()
+        finally:
+            if netconf:
+                try:
+                    netconf.disconnect()
+                except Exception:
+                    pass
 
-        # Check 7: Commit Status Check
-        self._check_commit_status()
-        
         return self.results
 
     def _check_image_presence(self, filesystem: str, target_image_filename: str):
         """Check if target image exists on the device"""
         try:
-            ssh = SSHClient(self.ip_address, self.username, self.password, self.enable_password)
-            if ssh.connect():
-                exists = ssh.check_file_exists(filesystem, target_image_filename)
-                ssh.disconnect()
-                
-                if exists:
-                    self.results.append({
-                        'check_name': 'Image Presence',
-                        'result': 'PASS',
-                        'message': f'Verified: {target_image_filename} exists on {filesystem}:'
-                    })
+            with acquire_ssh(self.ip_address, self.username, self.password, self.enable_password) as ssh:
+                if ssh:
+                    exists = ssh.check_file_exists(filesystem, target_image_filename)
+
+                    if exists:
+                        self.results.append({
+                            'check_name': 'Image Presence',
+                            'result': 'PASS',
+                            'message': f'Verified: {target_image_filename} exists on {filesystem}:'
+                        })
+                    else:
+                        self.results.append({
+                            'check_name': 'Image Presence',
+                            'result': 'FAIL',
+                            'message': f'Image {target_image_filename} NOT FOUND on {filesystem}:. Please copy the image first.'
+                        })
                 else:
                     self.results.append({
                         'check_name': 'Image Presence',
-                        'result': 'FAIL',
-                        'message': f'Image {target_image_filename} NOT FOUND on {filesystem}:. Please copy the image first.'
+                        'result': 'ERROR',
+                        'message': 'Could not connect via SSH to verify image presence'
                     })
-            else:
-                self.results.append({
-                    'check_name': 'Image Presence',
-                    'result': 'ERROR',
-                    'message': 'Could not connect via SSH to verify image presence'
-                })
         except Exception as e:
             self.results.append({
                 'check_name': 'Image Presence',
@@ -152,28 +169,25 @@ class PreCheckEngine:
                 'message': f'Target version ({target_version}) is higher than current version ({current_version}). Upgrade path looks valid.'
             })
     
-    def _check_boot_variables(self, device_role: str):
+    def _check_boot_variables(self, device_role: str, netconf: NetconfClient = None):
         """Check boot system configuration for Install Mode"""
         boot_var_value = None
 
-        # Try NETCONF first
+        # Try NETCONF first (shared session established by run_all_checks)
         try:
-            netconf = NetconfClient(self.ip_address, self.netconf_port, self.username, self.password)
-            if netconf.connect():
+            if netconf:
                 boot_info = netconf.get_boot_variables()
                 if boot_info:
                     boot_var_value = boot_info.get('boot_system', '')
-                netconf.disconnect()
         except Exception as e:
             print(f"NETCONF boot check failed: {e}")
 
         # Fallback to SSH if NETCONF didn't return a value
         if not boot_var_value:
             try:
-                ssh = SSHClient(self.ip_address, self.username, self.password, self.enable_password)
-                if ssh.connect():
-                    boot_var_value = ssh.get_boot_variables()
-                    ssh.disconnect()
+                with acquire_ssh(self.ip_address, self.username, self.password, self.enable_password) as ssh:
+                    if ssh:
+                        boot_var_value = ssh.get_boot_variables()
             except Exception as e:
                 print(f"SSH boot check failed: {e}")
 
@@ -216,20 +230,18 @@ class PreCheckEngine:
                 'message': 'Could not retrieve boot variable via NETCONF or SSH — manual verification required.'
             })
     
-    def _check_disk_space(self, device_role: str, filesystem: str, target_image_size_mb: float = 0):
+    def _check_disk_space(self, device_role: str, filesystem: str, target_image_size_mb: float = 0, netconf: NetconfClient = None):
         """Check disk space thresholds"""
         fs_info_list = []
         netconf_success = False
 
-        # Try NETCONF first
+        # Try NETCONF first (shared session established by run_all_checks)
         try:
-            netconf = NetconfClient(self.ip_address, self.netconf_port, self.username, self.password)
-            
-            if netconf.connect():
+            if netconf:
                 # For switches, check all stack members
                 if device_role == 'Switch':
                     stack_members = netconf.get_stack_members()
-                    
+
                     if stack_members:
                         for member in stack_members:
                             fs_info = netconf.get_filesystem_info(member['filesystem'])
@@ -249,8 +261,6 @@ class PreCheckEngine:
                     if fs_info:
                         fs_info_list.append(fs_info)
                         netconf_success = True
-                
-                netconf.disconnect()
         except Exception as e:
              print(f"NETCONF disk check failed: {e}")
 
@@ -300,27 +310,26 @@ class PreCheckEngine:
 
         # Fallback to SSH if NETCONF failed or returned no data
         try:
-            ssh = SSHClient(self.ip_address, self.username, self.password, self.enable_password)
-            if ssh.connect():
-                # Note: SSH implementation in ssh_client currently only gets main filesystem
-                # Improvements to get stack members via SSH could be added later
-                fs_info = ssh.get_disk_space(filesystem)
-                ssh.disconnect()
-                
-                if fs_info:
-                    self._evaluate_disk_space(fs_info, target_image_size_mb)
+            with acquire_ssh(self.ip_address, self.username, self.password, self.enable_password) as ssh:
+                if ssh:
+                    # Note: SSH implementation in ssh_client currently only gets main filesystem
+                    # Improvements to get stack members via SSH could be added later
+                    fs_info = ssh.get_disk_space(filesystem)
+
+                    if fs_info:
+                        self._evaluate_disk_space(fs_info, target_image_size_mb)
+                    else:
+                         self.results.append({
+                            'check_name': 'Disk Space Thresholds',
+                            'result': 'ERROR',
+                            'message': 'Could not retrieve filesystem information via SSH'
+                        })
                 else:
                      self.results.append({
                         'check_name': 'Disk Space Thresholds',
                         'result': 'ERROR',
-                        'message': 'Could not retrieve filesystem information via SSH'
+                        'message': 'Could not connect via SSH to check disk space'
                     })
-            else:
-                 self.results.append({
-                    'check_name': 'Disk Space Thresholds',
-                    'result': 'ERROR',
-                    'message': 'Could not connect via SSH to check disk space'
-                })
         except Exception as e:
             self.results.append({
                 'check_name': 'Disk Space Thresholds',
@@ -384,11 +393,17 @@ class PreCheckEngine:
     def _check_rommon_flags(self):
         """Check ROMMON variables for SWITCH_IGNORE_STARTUP_CFG flag"""
         try:
-            ssh = SSHClient(self.ip_address, self.username, self.password, self.enable_password)
-            if ssh.connect():
+            with acquire_ssh(self.ip_address, self.username, self.password, self.enable_password) as ssh:
+                if not ssh:
+                    self.results.append({
+                        'check_name': 'ROMMON Flag Validation',
+                        'result': 'ERROR',
+                        'message': 'Could not connect via SSH to check ROMMON variables'
+                    })
+                    return
+
                 rommon_info = ssh.check_rommon_variables()
-                ssh.disconnect()
-                
+
                 if 'error' in rommon_info:
                     self.results.append({
                         'check_name': 'ROMMON Flag Validation',
@@ -407,12 +422,6 @@ class PreCheckEngine:
                         'result': 'PASS',
                         'message': 'ROMMON variables OK (no ignore startup config flag)'
                     })
-            else:
-                self.results.append({
-                    'check_name': 'ROMMON Flag Validation',
-                    'result': 'ERROR',
-                    'message': 'Could not connect via SSH to check ROMMON variables'
-                })
         except Exception as e:
             self.results.append({
                 'check_name': 'ROMMON Flag Validation',
@@ -448,11 +457,17 @@ class PreCheckEngine:
             # Method 1: NETCONF (TBD - keeping SSH as primary for now as it's more reliable for this specific output)
             
             # Method 2: SSH
-            ssh = SSHClient(self.ip_address, self.username, self.password, self.enable_password)
-            if ssh.connect():
+            with acquire_ssh(self.ip_address, self.username, self.password, self.enable_password) as ssh:
+                if not ssh:
+                    self.results.append({
+                        'check_name': 'Commit Status Check',
+                        'result': 'WARN',
+                        'message': 'Could not connect via SSH to verify commit status'
+                    })
+                    return
+
                 output = ssh.get_install_summary()
-                ssh.disconnect()
-                
+
                 if not output:
                     self.results.append({
                         'check_name': 'Commit Status Check',
@@ -511,13 +526,6 @@ class PreCheckEngine:
                             'message': 'Could not verify commit status. Output may vary or install mode not active.'
                         })
 
-            else:
-                 self.results.append({
-                    'check_name': 'Commit Status Check',
-                    'result': 'WARN',
-                    'message': 'Could not connect via SSH to verify commit status'
-                })
-
         except Exception as e:
             self.results.append({
                 'check_name': 'Commit Status Check',
@@ -38,7 +38,19 @@ class SSHClient:
             # Enter enable mode if enable password is provided
             if self.enable_password and not self.connection.check_enable_mode():
                 self.connection.enable()
-            
+
+            # Tune the underlying paramiko transport for long-running
+            # operations (image copy / MD5 verify can run for minutes):
+            # keepalives prevent idle NAT/firewall drops, and the larger
+            # window/packet defaults apply to any channel opened later.
+            try:
+                transport = self.connection.remote_conn.transport
+                transport.set_keepalive(30)
+                transport.default_window_size = 2 * 1024 * 1024
+                transport.default_max_packet_size = 32768
+            except Exception as e:
+                print(f"Warning: could not tune SSH transport for {self.host}: {e}")
+
             return True
         except NetmikoAuthenticationException:
             print(f"SSH authentication failed to {self.host}")
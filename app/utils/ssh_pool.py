@@ -0,0 +1,98 @@
+"""
+Shared SSH session pool for IOS-XE Upgrade Manager
+Reuses a live SSHClient per (ip, username) across precheck/copy/verify
+phases, so a typical upgrade workflow pays one SSH handshake per device
+instead of one per phase. Idle sessions are evicted after a TTL.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple, Any
+
+from app.utils.ssh_client import SSHClient
+
+# Idle sessions older than this are disconnected on the next acquire
+IDLE_TTL = 60.0
+
+_pool_lock = threading.Lock()
+# (ip, username) -> {'client': SSHClient, 'in_use': bool, 'last_used': float}
+_sessions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+
+def _is_alive(client: SSHClient) -> bool:
+    """Check whether a pooled session is still usable"""
+    try:
+        return client.connection is not None and client.connection.is_alive()
+    except Exception:
+        return False
+
+
+def _evict_stale(now: float):
+    """Drop idle sessions past the TTL. Caller must hold _pool_lock."""
+    stale = [
+        key for key, entry in _sessions.items()
+        if not entry['in_use'] and (now - entry['last_used']) > IDLE_TTL
+    ]
+    for key in stale:
+        entry = _sessions.pop(key)
+        try:
+            entry['client'].disconnect()
+        except Exception:
+            pass
+
+
+@contextmanager
+def acquire_ssh(ip: str, username: str, password: str, enable_password: str = ''):
+    """
+    Yield a connected SSHClient for the device, reusing a pooled session
+    when one is idle. Yields None when the connection cannot be established.
+    On exit the session returns to the pool instead of disconnecting.
+    """
+    key = (ip, username)
+    now = time.monotonic()
+    client = None
+
+    with _pool_lock:
+        _evict_stale(now)
+        entry = _sessions.get(key)
+        if entry and not entry['in_use']:
+            entry['in_use'] = True
+            client = entry['client']
+
+    # Pooled session may have died while idle - drop it and reconnect
+    if client is not None and not _is_alive(client):
+        with _pool_lock:
+            _sessions.pop(key, None)
+        try:
+            client.disconnect()
+        except Exception:
+            pass
+        client = None
+
+    if client is None:
+        client = SSHClient(ip, username, password, enable_password)
+        if not client.connect():
+            yield None
+            return
+        with _pool_lock:
+            if key not in _sessions:
+                _sessions[key] = {'client': client, 'in_use': True, 'last_used': now}
+
+    try:
+        yield client
+    finally:
+        returned = False
+        with _pool_lock:
+            entry = _sessions.get(key)
+            if entry and entry['client'] is client:
+                entry['in_use'] = False
+                entry['last_used'] = time.monotonic()
+                returned = True
+        if not returned:
+            # Session was displaced from the pool (e.g. a concurrent holder);
+            # close it rather than leaking the transport
+            try:
+                client.disconnect()
+            except Exception:
+                pass
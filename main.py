@@ -15,20 +15,27 @@ from app.blueprints.verify_image import verify_image_bp
 from app.blueprints.reports import reports_bp
 from app.blueprints.models import models_bp
 from app.database.models import Database
+from app.extensions import OrjsonProvider
 import json
 import os
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
 
 # Load configuration
 with open('config.json', 'r') as f:
     config = json.load(f)
 
 # Initialize Flask app
-app = Flask(__name__, 
+app = Flask(__name__,
             template_folder='app/templates',
             static_folder='app/static')
-# Initialize Scheduler
-scheduler = BackgroundScheduler()
+# orjson-backed serialization for every jsonify() call
+app.json = OrjsonProvider(app)
+# Initialize Scheduler with an explicitly bounded worker pool.
+# All background device jobs (copy/verify/upgrade/install) run on this pool,
+# so a large bulk request queues instead of spawning unbounded workers.
+scheduler_workers = config.get('scheduler', {}).get('max_workers', 20)
+scheduler = BackgroundScheduler(executors={'default': ThreadPoolExecutor(scheduler_workers)})
 app.config['scheduler'] = scheduler
 app.config['SECRET_KEY'] = 'ios-xe-upgrade-manager-secret-key'
 # No file size limit - IOS-XE images can be large